@@ -0,0 +1,57 @@
+"""Primerjava cen izdelkov med trgovinami"""
+import importlib
+
+from .keywords import KeywordAutomaton, extract_brand, extract_flavor, scan_keywords
+from .metrics import METRICS, Metrics, write_metrics
+from .normalize import clean_price, clear_standardize_cache, standardize_cache_info, standardize_name
+from .parsing import (ParsedProduct, Product, build_match_key, create_match_key, extract_and_standardize_volume,
+                      parse_product)
+from .sources import SOURCES, SourceConfig
+
+# Funkcije, ki potrebujejo pandas/numpy, naložimo šele ob prvi uporabi
+_LAZY_ATTRIBUTES = {
+    'clean_prices': 'ingest',
+    'extract_volumes': 'ingest',
+    'parse_names': 'ingest',
+    'parse_names_parallel': 'ingest',
+    'ingest_products': 'ingest',
+    'products_from_frame': 'ingest',
+    'ParseCache': 'cache',
+    'ruleset_hash': 'cache',
+    'read_source': 'snapshot',
+    'fuzzy_match': 'fuzzy',
+    'Catalog': 'catalog',
+    'StringPool': 'catalog',
+    'UnitPriceIndex': 'unitprice',
+    'CatalogIndex': 'query',
+    'TopN': 'writers',
+    'open_writer': 'writers',
+    'PriceIndex': 'service',
+    'PriceService': 'service',
+    'ReloadError': 'service',
+    'load_frames': 'service',
+    'load_products': 'service',
+    'run_delta': 'delta',
+    'PriceHistory': 'history',
+    'basket_items': 'basket',
+    'store_prices': 'basket',
+    'plan_basket': 'basket',
+    'write_artifact': 'artifact',
+    'out_of_core_matches': 'partition',
+}
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
+
+__all__ = [
+    'KeywordAutomaton', 'extract_brand', 'extract_flavor', 'scan_keywords',
+    'clean_price', 'clear_standardize_cache', 'standardize_cache_info', 'standardize_name',
+    'ParsedProduct', 'Product', 'build_match_key', 'create_match_key', 'extract_and_standardize_volume',
+    'parse_product', 'SOURCES', 'SourceConfig', 'METRICS', 'Metrics', 'write_metrics',
+    *_LAZY_ATTRIBUTES,
+]
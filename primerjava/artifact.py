@@ -0,0 +1,172 @@
+"""Precomputed results artifact for the browser front-end (app.js)"""
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import re
+
+import numpy as np
+
+from .cache import ruleset_hash
+
+# Različica oblike artefakta; app.js zavrne neznane različice
+ARTIFACT_FORMAT = 'primerjava-results'
+ARTIFACT_VERSION = 1
+ARTIFACT_MANIFEST = 'artifact.json'
+
+# Vrstic na kos; app.js nalaga kose enega za drugim
+ARTIFACT_CHUNK_ROWS = 500
+
+# Ujemanja z razliko v ceni nad tem pragom (kot v izpisu main.py)
+PRICE_DIFFERENCE_THRESHOLD = 0.01
+
+MATCH_ARTIFACT_FIELDS = ['match_key', 'brand', 'flavor', 'volume_str', 'volume_ml', 'is_package', 'package_count',
+                         'left_source', 'left_name', 'left_price', 'right_source', 'right_name', 'right_price',
+                         'price_difference', 'price_difference_percent']
+PRODUCT_ARTIFACT_FIELDS = ['name', 'original_name', 'price', 'brand', 'flavor', 'volume_str', 'volume_ml',
+                           'is_package', 'package_count', 'single_unit_ml', 'match_key']
+
+# Stolpci z nizi se zapišejo kot kode v tabelo nizov kosa
+_STRING_FIELDS = {'match_key', 'brand', 'flavor', 'volume_str', 'left_source', 'left_name', 'right_source',
+                  'right_name', 'name', 'original_name'}
+# Imena kosov, ki jih zapiše write_artifact; drugih datotek v mapi ne brišemo
+_CHUNK_NAME = re.compile(r'(products|matches)-[0-9a-f]{16}\.json\.gz')
+
+_ROUNDING = {'left_price': 2, 'right_price': 2, 'price': 2, 'price_difference': 2, 'price_difference_percent': 2}
+
+def _encode_chunk(columns, fields):
+    """Columns -> compact chunk: string columns become codes into one per-chunk string table (None -> -1)"""
+    strings = {}
+    encoded = {}
+    for field in fields:
+        values = columns[field]
+        values = values.tolist() if isinstance(values, np.ndarray) else list(values)
+        if field in _STRING_FIELDS:
+            encoded[field] = [-1 if value is None else strings.setdefault(value, len(strings)) for value in values]
+        elif field in _ROUNDING:
+            encoded[field] = [round(value, _ROUNDING[field]) for value in values]
+        else:
+            encoded[field] = values
+    return {'version': ARTIFACT_VERSION, 'fields': fields, 'rows': len(encoded[fields[0]]) if fields else 0,
+            'strings': list(strings), 'columns': encoded}
+
+def _write_chunk(directory, prefix, chunk):
+    """Write a gzip chunk named by its content hash, so unchanged chunks keep their URL (and browser cache)"""
+    payload = gzip.compress(json.dumps(chunk, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), mtime=0)
+    name = f"{prefix}-{hashlib.sha1(payload).hexdigest()[:16]}.json.gz"
+    path = os.path.join(directory, name)
+    if not os.path.exists(path):
+        with open(f"{path}.tmp", 'wb') as f:
+            f.write(payload)
+        os.replace(f"{path}.tmp", path)
+    return {'file': name, 'rows': chunk['rows'], 'bytes': len(payload)}
+
+def _product_columns(catalog, rows):
+    flavor_labels = [', '.join(flavor) if flavor else 'N/A' for flavor in catalog.flavors]
+    volume_codes = catalog.volume_codes[rows]
+    return {
+        'name': [catalog.strings[code] for code in catalog.name_codes[rows]],
+        'original_name': [catalog.strings[code] for code in catalog.original_codes[rows]],
+        'price': catalog.price[rows],
+        'brand': [catalog.brands[code] for code in catalog.brand_codes[rows]],
+        'flavor': [flavor_labels[code] for code in catalog.flavor_codes[rows]],
+        'volume_str': [catalog.volume_strs[code] if code >= 0 else None for code in volume_codes],
+        'volume_ml': [value if value >= 0 else None for value in catalog.volume_ml[rows].tolist()],
+        'is_package': catalog.is_package[rows],
+        'package_count': [value if value >= 0 else None for value in catalog.package_count[rows].tolist()],
+        'single_unit_ml': [value if value >= 0 else None for value in catalog.single_unit_ml[rows].tolist()],
+        'match_key': [catalog.match_keys[code] for code in catalog.match_key_codes[rows]],
+    }
+
+def different_price_pairs(catalog, key_ids, group_ids):
+    """
+    Row pairs of all source pairs whose price differs by more than PRICE_DIFFERENCE_THRESHOLD,
+    ordered by the absolute percentage difference (largest first, stable like the printed report)
+    """
+    left_parts, right_parts, score_parts = [], [], []
+    for i, left_source in enumerate(catalog.sources):
+        for right_source in catalog.sources[i + 1:]:
+            for left_rows, right_rows in catalog.iter_pair_batches(key_ids, group_ids, left_source, right_source):
+                price_differences, price_difference_percents = catalog.price_differences(left_rows, right_rows)
+                different = np.abs(price_differences) > PRICE_DIFFERENCE_THRESHOLD
+                left_parts.append(left_rows[different])
+                right_parts.append(right_rows[different])
+                score_parts.append(np.abs(price_difference_percents[different]))
+    if not left_parts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    order = np.argsort(-np.concatenate(score_parts), kind='stable')
+    return np.concatenate(left_parts)[order], np.concatenate(right_parts)[order]
+
+def _manifest_chunks(manifest):
+    """File names of all chunks a manifest references"""
+    files = {chunk['file'] for chunk in manifest['matches']['chunks']}
+    files.update(chunk['file'] for source in manifest['sources'] for chunk in source['chunks'])
+    return files
+
+def _previous_chunks(path):
+    """Chunks of the manifest currently on disk (empty if there is none or it is unreadable)"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return _manifest_chunks(json.load(f))
+    except (OSError, ValueError, KeyError, TypeError):
+        return set()
+
+def write_artifact(catalog, key_ids, group_ids, directory, chunk_rows=ARTIFACT_CHUNK_ROWS):
+    """
+    Write parsed products and price-difference matches as a versioned artifact
+    The manifest (artifact.json) lists per-source product counts and the gzip chunks; it is
+    replaced last, so a reader never sees a manifest pointing at missing chunks. Chunks of the
+    previous manifest are kept, so a browser still paging through it can finish; older artifact
+    chunks are removed, other files in the directory are left alone. Returns the manifest.
+    """
+    os.makedirs(directory, exist_ok=True)
+    left_rows, right_rows = different_price_pairs(catalog, key_ids, group_ids)
+    match_chunks = []
+    for start in range(0, len(left_rows), chunk_rows):
+        columns = catalog.match_batch(left_rows[start:start + chunk_rows], right_rows[start:start + chunk_rows])
+        match_chunks.append(_write_chunk(directory, 'matches', _encode_chunk(columns, MATCH_ARTIFACT_FIELDS)))
+
+    sources = []
+    for source in catalog.sources:
+        rows = catalog.rows_of(source)
+        chunks = []
+        for start in range(0, len(rows), chunk_rows):
+            columns = _product_columns(catalog, rows[start:start + chunk_rows])
+            chunks.append(_write_chunk(directory, 'products', _encode_chunk(columns, PRODUCT_ARTIFACT_FIELDS)))
+        is_package = catalog.is_package[rows]
+        sources.append({
+            'source': source,
+            'products': len(rows),
+            'packages': int(is_package.sum()),
+            'singles': int((~is_package & (catalog.volume_codes[rows] >= 0)).sum()),
+            'chunks': chunks,
+        })
+
+    manifest = {
+        'format': ARTIFACT_FORMAT,
+        'version': ARTIFACT_VERSION,
+        'ruleset': ruleset_hash(),
+        'generated': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'sources': sources,
+        'matches': {'rows': len(left_rows), 'chunks': match_chunks},
+    }
+    path = os.path.join(directory, ARTIFACT_MANIFEST)
+    keep = _previous_chunks(path)
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(f"{path}.tmp", path)
+
+    keep |= _manifest_chunks(manifest)
+    for name in os.listdir(directory):
+        if _CHUNK_NAME.fullmatch(name) and name not in keep:
+            os.remove(os.path.join(directory, name))
+    return manifest
+
+def read_chunk(path):
+    """Decode one chunk back to {field: list} (the inverse of the front-end's decoding)"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        chunk = json.load(f)
+    strings = chunk['strings']
+    return {field: [None if code < 0 else strings[code] for code in values] if field in _STRING_FIELDS else values
+            for field, values in chunk['columns'].items()}
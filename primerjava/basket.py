@@ -0,0 +1,282 @@
+"""Cheapest assignment of a shopping list to stores"""
+import argparse
+import math
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from .normalize import standardize_name
+from .parsing import create_match_key
+
+# Do toliko trgovin rešujemo natančno z dinamičnim programom po podmnožicah trgovin
+EXACT_MAX_STORES = 12
+
+# Omejitev vozlišč pri razveji in omeji; ob prekoračitvi vrnemo najboljšo najdeno rešitev in spodnjo mejo
+BRANCH_MAX_NODES = 100000
+
+BasketItem = namedtuple('BasketItem', ['name', 'match_key', 'quantity'])
+Assignment = namedtuple('Assignment', ['name', 'match_key', 'quantity', 'source', 'price', 'cost'])
+BasketPlan = namedtuple('BasketPlan', ['stores', 'assignments', 'unavailable', 'item_cost', 'fixed_cost', 'total',
+                                       'lower_bound', 'optimal'])
+
+def basket_items(lines):
+    """
+    Shopping list lines 'raw product name;quantity' (quantity defaults to 1) -> BasketItems
+    Names are keyed like the catalog: create_match_key of the standardized name.
+    Raises ValueError for a quantity that is not a positive number.
+    """
+    items = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        name, _, quantity = line.rpartition(';') if ';' in line else (line, '', '1')
+        name = name.strip()
+        try:
+            amount = float(quantity.replace(',', '.'))
+        except ValueError:
+            amount = math.nan
+        if not 0 < amount < math.inf:
+            raise ValueError(f"Quantity must be a positive number: {line!r}")
+        items.append(BasketItem(name, create_match_key(standardize_name(name)), amount))
+    return items
+
+def store_prices(catalog, match_keys):
+    """Cheapest price of every match_key in every catalog source (items x sources, inf where missing)"""
+    codes = {key: code for code, key in enumerate(catalog.match_keys)}
+    prices = np.full((len(match_keys), len(catalog.sources)), np.inf)
+    offers = pd.DataFrame({'key': catalog.match_key_codes, 'source': catalog.source_codes, 'price': catalog.price})
+    cheapest = offers.groupby(['key', 'source'], sort=False)['price'].min()
+    cheapest_by_key = {}
+    for (key, source), price in cheapest.items():
+        cheapest_by_key.setdefault(key, []).append((source, price))
+    for item, match_key in enumerate(match_keys):
+        for source, price in cheapest_by_key.get(codes.get(match_key, -1), []):
+            prices[item, source] = price
+    return prices
+
+def _subset_costs(costs, fixed):
+    """
+    Item cost of every store subset (bit i = store i) by DP over subsets:
+    the row minimum of a subset is that of the subset without its lowest store, combined with that store.
+    """
+    n_items, n_stores = costs.shape
+    best = np.empty((1 << n_stores, n_items))
+    best[0] = np.inf
+    fixed_cost = np.zeros(1 << n_stores)
+    for subset in range(1, 1 << n_stores):
+        store = (subset & -subset).bit_length() - 1
+        rest = subset & (subset - 1)
+        np.minimum(best[rest], costs[:, store], out=best[subset])
+        fixed_cost[subset] = fixed_cost[rest] + fixed[store]
+    return best.sum(axis=1), fixed_cost
+
+def _exact(costs, fixed, max_stores):
+    item_cost, fixed_cost = _subset_costs(costs, fixed)
+    sizes = np.array([bin(subset).count('1') for subset in range(len(item_cost))])
+    total = item_cost + fixed_cost
+    total[(sizes > max_stores) | (sizes == 0)] = np.inf
+    subset = int(np.argmin(total))
+    if np.isinf(total[subset]):
+        return [], None
+    return [store for store in range(costs.shape[1]) if subset >> store & 1], None
+
+def _total(costs, fixed, stores):
+    if not stores:
+        return np.inf
+    return costs[:, stores].min(axis=1).sum() + fixed[stores].sum()
+
+def _greedy(costs, fixed, max_stores):
+    """Add the store that lowers the total most, then improve by single swaps and removals"""
+    n_stores = costs.shape[1]
+    stores = []
+    current = np.full(costs.shape[0], np.inf)
+    while len(stores) < max_stores:
+        candidates = [store for store in range(n_stores) if store not in stores]
+        if not candidates:
+            break
+        # Dokler kakšen izdelek ni pokrit, izbiramo po številu pokritih izdelkov
+        uncovered = np.isinf(current)
+        scores = [(-(uncovered & np.isfinite(costs[:, store])).sum(),
+                   np.minimum(current, costs[:, store])[~uncovered].sum() + fixed[store]) for store in candidates]
+        store = candidates[min(range(len(candidates)), key=scores.__getitem__)]
+        if not uncovered.any() and _total(costs, fixed, stores + [store]) >= _total(costs, fixed, stores):
+            break
+        stores.append(store)
+        current = np.minimum(current, costs[:, store])
+
+    improved = True
+    while improved:
+        improved = False
+        best = _total(costs, fixed, stores)
+        neighbours = [[s for s in stores if s != out] for out in stores]
+        neighbours += [[s if s != out else new for s in stores] for out in stores for new in range(n_stores)
+                       if new not in stores]
+        if len(stores) < max_stores:
+            neighbours += [stores + [new] for new in range(n_stores) if new not in stores]
+        for candidate in neighbours:
+            total = _total(costs, fixed, candidate)
+            if total < best - 1e-9:
+                stores, best, improved = candidate, total, True
+    return sorted(stores)
+
+def _branch_and_bound(costs, fixed, max_stores, max_nodes=BRANCH_MAX_NODES):
+    """
+    Include/exclude search over stores ordered by items stocked, then by their cost
+    The bound of a node is its fixed cost plus the item cost if every undecided store were free;
+    the greedy plan is the starting upper bound. Returns (stores, lower bound), where the bound
+    is None when the search finished within max_nodes (the plan is optimal).
+    """
+    n_stores = costs.shape[1]
+    finite = np.isfinite(costs)
+    order = np.lexsort((np.where(finite, costs, 0).sum(axis=0), -finite.sum(axis=0)))
+    ordered = costs[:, order]
+    suffix_min = np.full((n_stores + 1, costs.shape[0]), np.inf)
+    for position in range(n_stores - 1, -1, -1):
+        suffix_min[position] = np.minimum(suffix_min[position + 1], ordered[:, position])
+
+    best_stores = _greedy(costs, fixed, max_stores)
+    best_total = _total(costs, fixed, best_stores)
+    nodes = 0
+    # Sklad: (naslednja trgovina, izbrane trgovine, najmanjše cene izdelkov v izbranih, fiksni stroški)
+    stack = [(0, [], np.full(costs.shape[0], np.inf), 0.0)]
+    while stack:
+        nodes += 1
+        if nodes > max_nodes:
+            # Najmanjša meja odprtih vozlišč je spodnja meja optimuma
+            open_bound = min(np.minimum(node[2], suffix_min[node[0]]).sum() + node[3] for node in stack)
+            return best_stores, min(open_bound, best_total)
+        position, chosen, chosen_min, chosen_fixed = stack.pop()
+        bound = np.minimum(chosen_min, suffix_min[position]).sum() + chosen_fixed
+        if bound >= best_total - 1e-9:
+            continue
+        if chosen:
+            total = chosen_min.sum() + chosen_fixed
+            if total < best_total - 1e-9:
+                best_total, best_stores = total, sorted(int(order[store]) for store in chosen)
+        if position == n_stores:
+            continue
+        stack.append((position + 1, chosen, chosen_min, chosen_fixed))
+        if len(chosen) < max_stores:
+            store = order[position]
+            stack.append((position + 1, chosen + [position], np.minimum(chosen_min, ordered[:, position]),
+                          chosen_fixed + fixed[store]))
+    return best_stores, None
+
+def plan_basket(items, prices, sources, fixed_costs=None, max_stores=None):
+    """
+    Cheapest BasketPlan for BasketItems, given prices (items x sources) from store_prices
+    fixed_costs maps a source to the cost of visiting it; max_stores caps the stores visited.
+    Items sold nowhere are listed as unavailable. Up to EXACT_MAX_STORES stores the plan is
+    optimal; above it branch and bound is used, and a plan found within BRANCH_MAX_NODES
+    nodes without a proof of optimality has optimal=False and lower_bound bounds the gap.
+    """
+    if any(not item.quantity > 0 for item in items):
+        # 0 * inf (izdelka ni v trgovini) bi dal NaN in pokvaril vsoto trgovine
+        raise ValueError("Basket quantities must be positive")
+    fixed_costs = fixed_costs or {}
+    fixed = np.array([float(fixed_costs.get(source, 0.0)) for source in sources])
+    if not np.isfinite(fixed).all() or (fixed < 0).any():
+        # Negativen strošek obiska pokvari spodnjo mejo, po kateri reže razveji in omeji
+        raise ValueError("Fixed store costs must be finite and not negative")
+    quantities = np.array([item.quantity for item in items], dtype=np.float64)
+    available = np.isfinite(prices).any(axis=1) if len(items) else np.zeros(0, dtype=bool)
+    unavailable = [item for item, ok in zip(items, available) if not ok]
+
+    # Ponudbe trgovin, ki same nimajo ničesar s seznama, izpustimo
+    stocked = np.flatnonzero(np.isfinite(prices[available]).any(axis=0))
+    costs = prices[available][:, stocked] * quantities[available, None]
+    if max_stores is None:
+        max_stores = len(stocked)
+    if not available.any() or max_stores < 1:
+        return BasketPlan([], [], unavailable, 0.0, 0.0, 0.0, 0.0, True)
+
+    if len(stocked) <= EXACT_MAX_STORES:
+        chosen, lower_bound = _exact(costs, fixed[stocked], max_stores)
+    else:
+        chosen, lower_bound = _branch_and_bound(costs, fixed[stocked], max_stores)
+    if not chosen or np.isinf(costs[:, chosen].min(axis=1)).any():
+        # Z omejitvijo števila trgovin nekaterih izdelkov ni mogoče kupiti
+        raise ValueError(f"No {max_stores} store(s) together sell every available item")
+
+    unit_prices = prices[available][:, stocked]
+    store_of_item = np.asarray(chosen)[np.argmin(costs[:, chosen], axis=1)]
+    assignments = [
+        Assignment(item.name, item.match_key, item.quantity, sources[int(stocked[store])],
+                   float(unit_prices[row, store]), float(costs[row, store]))
+        for row, (item, store) in enumerate(zip([item for item, ok in zip(items, available) if ok], store_of_item))
+    ]
+
+    item_cost = float(sum(assignment.cost for assignment in assignments))
+    fixed_cost = float(fixed[stocked[chosen]].sum())
+    total = item_cost + fixed_cost
+    return BasketPlan([sources[int(stocked[store])] for store in chosen], assignments, unavailable,
+                      item_cost, fixed_cost, total, total if lower_bound is None else float(lower_bound),
+                      lower_bound is None)
+
+def _parse_fixed_costs(values, sources):
+    """['2.5'] (all stores) or ['Spar=1.5', 'Mercator=2'] -> {source: cost}; costs must be finite and >= 0"""
+    fixed_costs = {}
+    for value in values or []:
+        source, _, cost = value.rpartition('=')
+        try:
+            amount = float(cost.replace(',', '.'))
+        except ValueError:
+            amount = math.nan
+        if not 0 <= amount < math.inf:
+            raise ValueError(f"Fixed cost must be a finite number >= 0: {value!r}")
+        for name in ([source] if source else sources):
+            fixed_costs[name] = amount
+    return fixed_costs
+
+def main(argv=None):
+    """Command line entry point: python -m primerjava.basket"""
+    from .catalog import Catalog
+    from .service import load_frames
+    from .sources import SOURCES, SourceConfig
+
+    parser = argparse.ArgumentParser(prog='primerjava.basket', description='Najcenejši nakup seznama po trgovinah.')
+    parser.add_argument('list', help="nakupovalni seznam: ena vrstica 'ime izdelka;količina'")
+    parser.add_argument('--source', nargs=4, action='append',
+                        metavar=('NAME', 'PATH', 'NAME_COLUMN', 'PRICE_COLUMN'),
+                        help='trgovina (lahko večkrat); privzeto Spar in Mercator')
+    parser.add_argument('--fixed-cost', action='append', metavar='[STORE=]COST',
+                        help='strošek obiska trgovine (lahko večkrat); brez imena velja za vse trgovine')
+    parser.add_argument('--max-stores', type=int, default=None, help='največje število obiskanih trgovin')
+    parser.add_argument('--workers', type=int, default=1, help='število procesov za razčlenjevanje imen')
+    args = parser.parse_args(argv)
+
+    sources = [SourceConfig(*values) for values in args.source] if args.source else SOURCES
+    try:
+        with open(args.list, encoding='utf-8') as f:
+            items = basket_items(f)
+        catalog = Catalog(load_frames(sources, workers=args.workers))
+    except FileNotFoundError as e:
+        print(f"Napaka pri branju datotek: {e}")
+        return 1
+    except ValueError as e:
+        print(e)
+        return 1
+
+    prices = store_prices(catalog, [item.match_key for item in items])
+    try:
+        plan = plan_basket(items, prices, catalog.sources, _parse_fixed_costs(args.fixed_cost, catalog.sources),
+                           args.max_stores)
+    except ValueError as e:
+        print(e)
+        return 1
+
+    for source in plan.stores:
+        print(f"\n{source}:")
+        for assignment in plan.assignments:
+            if assignment.source == source:
+                print(f"  {assignment.quantity:g} x {assignment.name} (€{assignment.price:.2f}) = €{assignment.cost:.2f}")
+    for item in plan.unavailable:
+        print(f"Ni na voljo: {item.name} ({item.match_key})")
+    print(f"\nIzdelki: €{plan.item_cost:.2f}, obiski trgovin: €{plan.fixed_cost:.2f}, skupaj: €{plan.total:.2f}"
+          + ("" if plan.optimal else f" (spodnja meja €{plan.lower_bound:.2f})"))
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,250 @@
+"""Stage-by-stage benchmark of the pipeline on synthetic catalogs"""
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from .catalog import Catalog
+from .cli import _print_match, _print_price_spreads
+from .fuzzy import fuzzy_match
+from .ingest import clean_prices, extract_volumes, ingest_products
+from .keywords import extract_brand, extract_flavor
+from .normalize import clear_standardize_cache, standardize_name
+from .snapshot import read_source
+from .synthetic import SYNTHETIC_SOURCES, generate_catalogs
+
+BENCH_SIZES = {'10k': 10_000, '100k': 100_000, '1M': 1_000_000, '10M': 10_000_000}
+BENCH_BASELINE_PATH = 'bench_baseline.json'
+
+# Dovoljeno poslabšanje glede na shranjeno osnovo (0.25 = 25 % počasneje)
+BENCH_TOLERANCE = 0.25
+
+# Pisanje velikih xlsx datotek traja dlje kot sam benchmark; Excel ima največ 1048576 vrstic
+EXCEL_MAX_ROWS = 100_000
+
+# Krajše stopnje so preveč šumne za primerjavo z osnovo
+_MIN_COMPARE_SECONDS = 0.05
+
+class StageTimer:
+    """Collects wall time, row count and peak traced memory of named stages"""
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.stages = {}
+    
+    @contextmanager
+    def stage(self, name, rows):
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            peak = None
+            if self.trace_memory:
+                peak = tracemalloc.get_traced_memory()[1] / 2**20
+                tracemalloc.stop()
+            self.stages[name] = {
+                'rows': rows,
+                'seconds': round(seconds, 4),
+                'rows_per_second': round(rows / seconds) if seconds > 0 else None,
+                'peak_mb': None if peak is None else round(peak, 1),
+            }
+
+def _render_report(matches, price_matrix):
+    """Format the report with the CLI's printers, into a string"""
+    out = io.StringIO()
+    _print_price_spreads(price_matrix, file=out)
+    
+    different = [m for m in matches if abs(m['price_difference']) > 0.01]
+    different.sort(key=lambda x: abs(x['price_difference_percent']), reverse=True)
+    for i, match in enumerate(different, 1):
+        _print_match(i, match, file=out)
+    return out.getvalue()
+
+def run_benchmark(rows, seed=0, trace_memory=True, excel_max_rows=EXCEL_MAX_ROWS, fuzzy=True):
+    """Run every pipeline stage once on `rows` synthetic rows; returns {stage: measurements}"""
+    timer = StageTimer(trace_memory)
+    sources = SYNTHETIC_SOURCES
+    
+    with timer.stage('generate', rows):
+        catalogs = generate_catalogs(rows, seed, sources)
+    
+    if rows <= excel_max_rows:
+        with tempfile.TemporaryDirectory() as workdir:
+            configs = [config._replace(path=os.path.join(workdir, config.path)) for config in sources]
+            for config in configs:
+                catalogs[config.source].to_excel(config.path, index=False)
+            with timer.stage('excel_read', rows):
+                catalogs = {config.source: read_source(config, None) for config in configs}
+            snapshot_dir = os.path.join(workdir, 'snapshots')
+            with timer.stage('snapshot_write', rows):
+                for config in configs:
+                    read_source(config, snapshot_dir)
+            with timer.stage('snapshot_read', rows):
+                catalogs = {config.source: read_source(config, snapshot_dir) for config in configs}
+    
+    raw_names = pd.concat([catalogs[config.source][config.name_column] for config in sources], ignore_index=True)
+    raw_prices = pd.concat([catalogs[config.source][config.price_column] for config in sources], ignore_index=True)
+    
+    clear_standardize_cache()
+    with timer.stage('standardize_name', len(raw_names)):
+        names = [standardize_name(raw) for raw in raw_names]
+    with timer.stage('clean_price', len(raw_prices)):
+        clean_prices(raw_prices)
+    
+    # Ekstraktorji delujejo na različnih standardiziranih imenih, kot v ingest_products
+    unique_names = list(dict.fromkeys(names))
+    with timer.stage('extract_volume', len(unique_names)):
+        extract_volumes(pd.Series(unique_names, dtype=object))
+    with timer.stage('extract_brand', len(unique_names)):
+        for name in unique_names:
+            extract_brand(name)
+    with timer.stage('extract_flavor', len(unique_names)):
+        for name in unique_names:
+            extract_flavor(name)
+    
+    clear_standardize_cache()
+    with timer.stage('ingest', rows):
+        frames = {config.source: ingest_products(catalogs[config.source], config.name_column,
+                                                 config.price_column, config.source)
+                  for config in sources}
+    with timer.stage('catalog', rows):
+        catalog = Catalog(frames)
+    del frames
+    
+    with timer.stage('group', rows):
+        key_ids, group_ids = catalog.group_keys()
+    
+    source_names = [config.source for config in sources]
+    with timer.stage('match', len(group_ids)):
+        pairs = [catalog.pair_rows(key_ids, group_ids, left_source, right_source)
+                 for left_source, right_source in combinations(source_names, 2)]
+        left_rows = np.concatenate([left for left, _ in pairs])
+        right_rows = np.concatenate([right for _, right in pairs])
+        price_differences, _ = catalog.price_differences(left_rows, right_rows)
+        price_matrix = catalog.price_matrix(key_ids, group_ids)
+    
+    with timer.stage('report', len(left_rows)):
+        different = np.flatnonzero(np.abs(price_differences) > 0.01)
+        _render_report([catalog.match_record(left_rows[pair], right_rows[pair]) for pair in different], price_matrix)
+    
+    if fuzzy:
+        in_group = np.isin(key_ids, group_ids)
+        unmatched_by_source = {
+            source: catalog.products(np.flatnonzero(~in_group & (catalog.source_codes == code)))
+            for code, source in enumerate(catalog.sources)
+        }
+        with timer.stage('fuzzy', sum(len(products) for products in unmatched_by_source.values())):
+            for left_source, right_source in combinations(source_names, 2):
+                fuzzy_match(unmatched_by_source[left_source], unmatched_by_source[right_source])
+    
+    return timer.stages
+
+def compare_to_baseline(results, baseline, tolerance=BENCH_TOLERANCE):
+    """List of (size, stage, baseline_seconds, seconds) for stages slower than baseline by more than tolerance"""
+    regressions = []
+    for size, stages in results.items():
+        for stage, measured in stages.items():
+            reference = baseline.get(size, {}).get(stage)
+            if reference is None or reference['seconds'] < _MIN_COMPARE_SECONDS:
+                continue
+            if measured['seconds'] > reference['seconds'] * (1 + tolerance):
+                regressions.append((size, stage, reference['seconds'], measured['seconds']))
+    return regressions
+
+def _parse_size(value):
+    """'100k' or '100000' -> 100000"""
+    if value in BENCH_SIZES:
+        return value, BENCH_SIZES[value]
+    try:
+        return value, int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"neznana velikost {value!r} (npr. 10k, 100k, 1M, 10M ali število vrstic)")
+
+def main(argv=None):
+    """Command line entry point: python -m primerjava.bench"""
+    parser = argparse.ArgumentParser(prog='primerjava.bench', description='Meritve hitrosti po stopnjah.')
+    parser.add_argument('--sizes', nargs='+', type=_parse_size, default=[_parse_size('10k'), _parse_size('100k')],
+                        help='velikosti katalogov (10k, 100k, 1M, 10M ali število vrstic)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', metavar='PATH', default=BENCH_BASELINE_PATH,
+                        help='datoteka z osnovnimi meritvami')
+    parser.add_argument('--save-baseline', action='store_true', help='shrani meritve kot novo osnovo')
+    parser.add_argument('--tolerance', type=float, default=BENCH_TOLERANCE)
+    parser.add_argument('--no-memory', action='store_true',
+                        help='ne merimo porabe pomnilnika (tracemalloc upočasni čiste Python stopnje)')
+    parser.add_argument('--no-fuzzy', action='store_true', help='izpusti približno ujemanje')
+    parser.add_argument('--excel-max-rows', type=int, default=EXCEL_MAX_ROWS,
+                        help='največja velikost, pri kateri merimo tudi branje Excel datotek')
+    parser.add_argument('--output', metavar='PATH', default=None, help='zapiši meritve v JSON datoteko')
+    args = parser.parse_args(argv)
+    
+    results = {}
+    for label, rows in args.sizes:
+        print(f"Benchmark {label} ({rows} rows)...")
+        results[label] = run_benchmark(rows, args.seed, not args.no_memory, args.excel_max_rows, not args.no_fuzzy)
+        for stage, measured in results[label].items():
+            rate = f"{measured['rows_per_second']:>12,} rows/s" if measured['rows_per_second'] else ' ' * 19
+            memory = f"{measured['peak_mb']:>9.1f} MB" if measured['peak_mb'] is not None else ''
+            print(f"  {stage:<16}{measured['rows']:>10} rows {measured['seconds']:>9.3f} s {rate}{memory}")
+    
+    # ru_maxrss je na Linuxu v KiB, na macOS v bajtih
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    max_rss_mb = max_rss / 2**20 if sys.platform == 'darwin' else max_rss / 2**10
+    print(f"\nPeak RSS: {max_rss_mb:.0f} MB")
+    
+    report = {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'seed': args.seed,
+        'trace_memory': not args.no_memory,
+        'peak_rss_mb': round(max_rss_mb),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    
+    exit_code = 0
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('trace_memory', True) != report['trace_memory']:
+            print(f"Opozorilo: osnova v {args.baseline} je bila izmerjena "
+                  f"{'z' if baseline.get('trace_memory', True) else 'brez'} merjenja pomnilnika")
+        regressions = compare_to_baseline(results, baseline['results'], args.tolerance)
+        for size, stage, reference, seconds in regressions:
+            print(f"REGRESIJA {size} {stage}: {reference:.3f} s -> {seconds:.3f} s")
+        if regressions:
+            exit_code = 1
+        else:
+            print(f"Brez regresij glede na {args.baseline} (toleranca {args.tolerance:.0%})")
+    
+    if args.save_baseline:
+        baseline = {'results': {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f)
+        baseline.update({key: value for key, value in report.items() if key != 'results'})
+        baseline['results'].update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Osnova shranjena v {args.baseline}")
+    
+    return exit_code
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,191 @@
+"""Persistent SQLite cache of parsed names"""
+import hashlib
+import json
+import sqlite3
+
+import pandas as pd
+
+from .ingest import PARSE_CHUNK_SIZE, parse_names_parallel
+from .keywords import (BLOOD_ORANGE_KEYWORDS, BRAND_ALIASES, BRANDS, CARIBBEAN_OTHER_BRANDS, FLAVOR_KEYWORDS,
+                       KNOWN_BRANDS, OSHEE_FLAVORS, POMARANCA_VARIANTS, TECHNICAL_TERMS, _FALLBACK_WORD_RE)
+from .normalize import (UNWANTED_PATTERNS, _CLOSE_PAREN_SPACING_RE, _DASH_SPACING_RE, _DECIMAL_COMMA_RE,
+                        _DOT_SPACING_RE, _EDGE_PUNCTUATION_RE, _OPEN_PAREN_SPACING_RE, _PACKAGE_X_RE,
+                        _SPECIAL_CHARS_RE, _TAG_OR_SPACE_RE, _UNIT_SPACE_RE, _WHITESPACE_RE)
+from .parsing import PACKAGE_VOLUME_RE, SINGLE_VOLUME_RE, UNIT_TO_ML, ParsedProduct
+
+# Trajni predpomnilnik razčlenjenih imen med zagoni
+PARSE_CACHE_PATH = 'parse_cache.sqlite'
+PARSE_CACHE_MAX_ENTRIES = 1000000
+# Povečaj ob spremembi logike razčlenjevanja, ki je tabele pravil ne zajamejo
+PARSER_VERSION = 1
+
+# Največ parametrov v enem SQL stavku
+_SQLITE_BATCH_SIZE = 500
+
+def ruleset_hash():
+    """Hash of all rule tables and regexes that influence parsing"""
+    rules = {
+        'parser_version': PARSER_VERSION,
+        'normalization_patterns': [pattern.pattern for pattern in (
+            _TAG_OR_SPACE_RE, _DECIMAL_COMMA_RE, _UNIT_SPACE_RE, _PACKAGE_X_RE, _SPECIAL_CHARS_RE,
+            _WHITESPACE_RE, _DOT_SPACING_RE, _OPEN_PAREN_SPACING_RE, _CLOSE_PAREN_SPACING_RE,
+            _DASH_SPACING_RE, _EDGE_PUNCTUATION_RE, _FALLBACK_WORD_RE)],
+        'unwanted_patterns': UNWANTED_PATTERNS,
+        'volume_patterns': [PACKAGE_VOLUME_RE.pattern, SINGLE_VOLUME_RE.pattern],
+        'unit_to_ml': UNIT_TO_ML,
+        'flavor_keywords': FLAVOR_KEYWORDS,
+        'pomaranca_variants': POMARANCA_VARIANTS,
+        'oshee_flavors': OSHEE_FLAVORS,
+        'blood_orange_keywords': BLOOD_ORANGE_KEYWORDS,
+        'known_brands': KNOWN_BRANDS,
+        'technical_terms': TECHNICAL_TERMS,
+        'caribbean_other_brands': CARIBBEAN_OTHER_BRANDS,
+        'brands': BRANDS,
+        'brand_aliases': BRAND_ALIASES,
+    }
+    serialized = json.dumps(rules, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()[:16]
+
+def _optional_int(value):
+    return None if pd.isna(value) else int(value)
+
+class ParseCache:
+    """
+    Persistent SQLite cache of parse_names results
+    Entries are keyed by the raw name and the ruleset hash, so any change of the rule
+    tables invalidates them. Entries of other rulesets are deleted on open and the
+    least recently used entries are evicted above max_entries. Recency is the number of
+    the run (a counter stored in the database), not the wall clock.
+    Hits and misses count distinct raw names.
+    """
+    def __init__(self, path=PARSE_CACHE_PATH, max_entries=PARSE_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.ruleset = ruleset_hash()
+        self.hits = 0
+        self.misses = 0
+        
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('''
+            CREATE TABLE IF NOT EXISTS parsed_names (
+                raw_name TEXT NOT NULL,
+                ruleset TEXT NOT NULL,
+                name TEXT NOT NULL,
+                brand TEXT,
+                flavor TEXT,
+                volume_str TEXT,
+                volume_ml INTEGER,
+                is_package INTEGER,
+                package_count INTEGER,
+                single_unit_ml INTEGER,
+                match_key TEXT,
+                last_used INTEGER NOT NULL,
+                PRIMARY KEY (raw_name, ruleset)
+            )
+        ''')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS parsed_names_last_used ON parsed_names (last_used)')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS parse_runs (run INTEGER NOT NULL)')
+        
+        # Vnosi starih pravil so neveljavni
+        self.connection.execute('DELETE FROM parsed_names WHERE ruleset != ?', (self.ruleset,))
+        self.connection.commit()
+        self.run = self._next_run()
+        self.connection.commit()
+    
+    def _next_run(self):
+        """
+        Number of this run: one more than any earlier run or last_used value
+        (caches written before the counter stored Unix times in last_used)
+        """
+        self.connection.execute('BEGIN IMMEDIATE')
+        last_run = self.connection.execute('SELECT MAX(run) FROM parse_runs').fetchone()[0]
+        last_used = self.connection.execute('SELECT MAX(last_used) FROM parsed_names').fetchone()[0]
+        run = max(last_run or 0, last_used or 0) + 1
+        self.connection.execute('DELETE FROM parse_runs')
+        self.connection.execute('INSERT INTO parse_runs (run) VALUES (?)', (run,))
+        return run
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def close(self):
+        self.connection.close()
+    
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM parsed_names').fetchone()[0]
+    
+    def _lookup(self, keys):
+        """Cached rows for the given raw names (and mark them as used in this run)"""
+        found = {}
+        for start in range(0, len(keys), _SQLITE_BATCH_SIZE):
+            batch = keys[start:start + _SQLITE_BATCH_SIZE]
+            placeholders = ', '.join('?' * len(batch))
+            rows = self.connection.execute(f'''
+                SELECT raw_name, name, brand, flavor, volume_str, volume_ml, is_package,
+                       package_count, single_unit_ml, match_key
+                FROM parsed_names WHERE ruleset = ? AND raw_name IN ({placeholders})
+            ''', (self.ruleset, *batch))
+            for raw_name, name, brand, flavor, volume_str, volume_ml, is_package, package_count, single_unit_ml, match_key in rows:
+                found[raw_name] = (name, brand, tuple(json.loads(flavor)), volume_str, volume_ml,
+                                   bool(is_package), package_count, single_unit_ml, match_key)
+            self.connection.execute(f'''
+                UPDATE parsed_names SET last_used = ? WHERE ruleset = ? AND raw_name IN ({placeholders})
+            ''', (self.run, self.ruleset, *batch))
+        return found
+    
+    def _store(self, entries):
+        self.connection.executemany('''
+            INSERT OR REPLACE INTO parsed_names (
+                raw_name, ruleset, name, brand, flavor, volume_str, volume_ml, is_package,
+                package_count, single_unit_ml, match_key, last_used
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (raw_name, self.ruleset, name, brand, json.dumps(list(flavor)), volume_str, volume_ml,
+             int(is_package), package_count, single_unit_ml, match_key, self.run)
+            for raw_name, (name, brand, flavor, volume_str, volume_ml, is_package,
+                           package_count, single_unit_ml, match_key) in entries.items()
+        ])
+    
+    def evict(self):
+        """
+        Delete the least recently used entries above max_entries
+        Entries used or written in this run are never evicted, so the cache may stay above
+        max_entries when a single run touches more names than that.
+        """
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            self.connection.execute('''
+                DELETE FROM parsed_names WHERE rowid IN (
+                    SELECT rowid FROM parsed_names WHERE last_used < ? ORDER BY last_used LIMIT ?
+                )
+            ''', (self.run, excess))
+    
+    def parse_names(self, raw_names, workers=1, chunk_size=PARSE_CHUNK_SIZE):
+        """Same result as parse_names(raw_names); only names missing from the cache are parsed"""
+        # standardize_name dela nad str(name), zato je ključ niz
+        keys = [str(raw) for raw in raw_names]
+        unique_keys = list(dict.fromkeys(keys))
+        cached = self._lookup(unique_keys)
+        missing = [key for key in unique_keys if key not in cached]
+        self.hits += len(unique_keys) - len(missing)
+        self.misses += len(missing)
+        
+        if missing:
+            parsed = parse_names_parallel(missing, workers, chunk_size)
+            new_entries = {}
+            for raw_name, row in zip(missing, parsed.itertuples(index=False)):
+                new_entries[raw_name] = (row.name, row.brand, row.flavor,
+                                         None if pd.isna(row.volume_str) else row.volume_str,
+                                         _optional_int(row.volume_ml), bool(row.is_package),
+                                         _optional_int(row.package_count), _optional_int(row.single_unit_ml),
+                                         row.match_key)
+            self._store(new_entries)
+            cached.update(new_entries)
+        
+        self.evict()
+        self.connection.commit()
+        
+        return pd.DataFrame([cached[key] for key in keys], columns=['name', *ParsedProduct.__slots__], dtype=object)
@@ -0,0 +1,370 @@
+"""Columnar in-memory catalog with interned brand/flavor/volume codes"""
+import numpy as np
+import pandas as pd
+
+from .parsing import ParsedProduct, Product
+
+# Manjkajoča cela števila (volumen, število kosov) v stolpcih označimo z -1
+MISSING = -1
+
+# Največje število parov ujemanj v enem paketu pri pretočni obdelavi
+PAIR_BATCH_SIZE = 65536
+
+# Stolpci zapisa ujemanja (ključi slovarjev iz match_record)
+MATCH_FIELDS = ['match_key', 'brand', 'flavor', 'volume_str', 'volume_ml', 'is_package', 'package_count',
+                'left_source', 'left_original', 'left_name', 'left_price',
+                'right_source', 'right_original', 'right_name', 'right_price',
+                'price_difference', 'price_difference_percent']
+
+class StringPool:
+    """Distinct strings stored once in a single UTF-8 buffer, addressed by integer code"""
+    def __init__(self, strings):
+        encoded = [string.encode('utf-8') for string in strings]
+        self.offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)), out=self.offsets[1:])
+        self.data = b''.join(encoded)
+    
+    def __len__(self):
+        return len(self.offsets) - 1
+    
+    def __getitem__(self, code):
+        return self.data[self.offsets[code]:self.offsets[code + 1]].decode('utf-8')
+    
+    def __iter__(self):
+        offsets = self.offsets.tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield self.data[start:end].decode('utf-8')
+    
+    @property
+    def nbytes(self):
+        return len(self.data) + self.offsets.nbytes
+
+def _intern(values):
+    """Integer codes (in order of first appearance) and the list of distinct values"""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+    return codes.astype(np.int32), list(uniques)
+
+def _int_column(values):
+    """Nullable integer column -> int64 array with MISSING for NA"""
+    return pd.array(values, dtype='Int64').fillna(MISSING).to_numpy(dtype=np.int64)
+
+class Catalog:
+    """
+    Products of all sources as parallel NumPy columns
+    Brand, flavor, volume_str, match_key and source are interned into int32 codes, names and
+    original names point into one StringPool, and `keys` is a composite int64 join key
+    (brand, flavor, volume_str, is_package) - rows with equal keys match exactly.
+    """
+    def __init__(self, frames):
+        """Build from {source: product table from ingest_products}"""
+        frames = {source: frame for source, frame in frames.items()}
+        self.sources = list(frames)
+        counts = [len(frame) for frame in frames.values()]
+        self.source_codes = np.repeat(np.arange(len(self.sources), dtype=np.int16), counts)
+        
+        def column(name):
+            parts = [frame[name].to_numpy(dtype=object) for frame in frames.values()]
+            return np.concatenate(parts) if parts else np.empty(0, dtype=object)
+        
+        self.brand_codes, self.brands = _intern(column('brand'))
+        self.flavor_codes, self.flavors = _intern(column('flavor'))
+        self.volume_codes, self.volume_strs = _intern(column('volume_str'))
+        self.match_key_codes, self.match_keys = _intern(column('match_key'))
+        
+        self.price = np.concatenate([frame['price'].to_numpy(dtype=np.float64) for frame in frames.values()]
+                                    or [np.empty(0)])
+        self.is_package = column('is_package').astype(bool)
+        self.volume_ml = _int_column(column('volume_ml'))
+        self.package_count = _int_column(column('package_count'))
+        self.single_unit_ml = _int_column(column('single_unit_ml'))
+        
+        # Cena na liter (€/L) za primerjavo med velikostmi paketov; NaN brez volumna
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.unit_price = np.where(self.volume_ml > 0, self.price * 1000 / self.volume_ml, np.nan)
+        
+        # Standardizirana in originalna imena si delijo en bazen nizov
+        name_codes, pool = _intern(np.concatenate([column('name'), column('original_name')]))
+        self.strings = StringPool(pool)
+        self.name_codes = name_codes[:len(self.price)]
+        self.original_codes = name_codes[len(self.price):]
+        
+        n_volumes = len(self.volume_strs) + 1
+        self.keys = (((self.brand_codes.astype(np.int64) * len(self.flavors) + self.flavor_codes) * n_volumes
+                      + self.volume_codes + 1) * 2 + self.is_package)
+    
+    def __len__(self):
+        return len(self.price)
+    
+    @property
+    def nbytes(self):
+        """Approximate memory of the columns and the string pool"""
+        arrays = (self.source_codes, self.brand_codes, self.flavor_codes, self.volume_codes, self.match_key_codes,
+                  self.price, self.unit_price, self.is_package, self.volume_ml, self.package_count, self.single_unit_ml,
+                  self.name_codes, self.original_codes, self.keys)
+        return sum(array.nbytes for array in arrays) + self.strings.nbytes
+    
+    def name(self, row):
+        return self.strings[self.name_codes[row]]
+    
+    def original_name(self, row):
+        return self.strings[self.original_codes[row]]
+    
+    def parsed(self, row):
+        """ParsedProduct of one row"""
+        volume_code = self.volume_codes[row]
+        return ParsedProduct(
+            self.brands[self.brand_codes[row]], self.flavors[self.flavor_codes[row]],
+            self.volume_strs[volume_code] if volume_code >= 0 else None,
+            _optional_int(self.volume_ml[row]), bool(self.is_package[row]),
+            _optional_int(self.package_count[row]), _optional_int(self.single_unit_ml[row]),
+            self.match_keys[self.match_key_codes[row]],
+        )
+    
+    def product(self, row):
+        """Materialize one row as a Product"""
+        return Product(self.original_name(row), self.name(row), float(self.price[row]),
+                       self.sources[self.source_codes[row]], self.parsed(row))
+    
+    def products(self, rows):
+        """Materialize rows as Products (for reports and APIs that work on Product lists)"""
+        return [self.product(row) for row in rows]
+    
+    def rows_of(self, source):
+        """Row numbers of one source"""
+        return np.flatnonzero(self.source_codes == self.sources.index(source))
+    
+    def group_keys(self, min_sources=2):
+        """
+        Dense key ids of all rows and the ids present in at least min_sources sources
+        Ids follow the order of first appearance of each key.
+        """
+        key_ids, _ = pd.factorize(self.keys)
+        n_sources = max(len(self.sources), 1)
+        key_source = np.unique(key_ids.astype(np.int64) * n_sources + self.source_codes)
+        source_counts = np.bincount(key_source // n_sources, minlength=key_ids.max() + 1 if len(key_ids) else 0)
+        return key_ids, np.flatnonzero(source_counts >= min_sources)
+    
+    def _key_order(self, key_ids, group_ids):
+        """Rank of every group id when ordered by match_key string (ties keep first appearance)"""
+        first_rows = np.full(len(group_ids), len(key_ids), dtype=np.int64)
+        rank_of = np.full(key_ids.max() + 1 if len(key_ids) else 0, -1, dtype=np.int64)
+        rank_of[group_ids] = np.arange(len(group_ids))
+        in_group = rank_of[key_ids] >= 0
+        rows = np.flatnonzero(in_group)
+        np.minimum.at(first_rows, rank_of[key_ids[rows]], rows)
+        
+        group_match_keys = [self.match_keys[code] for code in self.match_key_codes[first_rows]]
+        order = sorted(range(len(group_ids)), key=lambda i: group_match_keys[i])
+        rank = np.empty(len(group_ids), dtype=np.int64)
+        rank[order] = np.arange(len(group_ids))
+        
+        result = np.full(len(rank_of), -1, dtype=np.int64)
+        result[group_ids] = rank
+        return result
+    
+    def pair_rows(self, key_ids, group_ids, left_source, right_source):
+        """
+        Row pairs (left_rows, right_rows) of two sources sharing a key, in report order:
+        keys by match_key, then left rows, then right rows in input order
+        """
+        batches = list(self.iter_pair_batches(key_ids, group_ids, left_source, right_source))
+        empty = np.empty(0, dtype=np.int64)
+        return (np.concatenate([left for left, _ in batches] or [empty]),
+                np.concatenate([right for _, right in batches] or [empty]))
+    
+    def iter_pair_batches(self, key_ids, group_ids, left_source, right_source, batch_size=PAIR_BATCH_SIZE,
+                          max_pairs_per_key=None):
+        """
+        pair_rows in consecutive batches of about batch_size pairs, so all pairs never have to be in memory
+        (one left row with more than batch_size partners still forms a single batch)
+        Keys with more than max_pairs_per_key pairs are skipped (compare them with key_summary instead).
+        """
+        key_rank = self._key_order(key_ids, group_ids)
+        
+        def sorted_rows(source):
+            rows = self.rows_of(source)
+            rows = rows[key_rank[key_ids[rows]] >= 0]
+            ranks = key_rank[key_ids[rows]]
+            order = np.lexsort((rows, ranks))
+            return rows[order], ranks[order]
+        
+        left_rows, left_ranks = sorted_rows(left_source)
+        right_rows, right_ranks = sorted_rows(right_source)
+        
+        # Za vsako levo vrstico: začetek in število desnih vrstic z istim ključem
+        right_start = np.searchsorted(right_ranks, left_ranks, side='left')
+        right_count = np.searchsorted(right_ranks, left_ranks, side='right') - right_start
+        
+        if max_pairs_per_key is not None:
+            left_count = np.bincount(left_ranks, minlength=len(group_ids))[left_ranks]
+            keep = left_count * right_count <= max_pairs_per_key
+            left_rows, right_start, right_count = left_rows[keep], right_start[keep], right_count[keep]
+        
+        ends = np.cumsum(right_count)
+        start = 0
+        while start < len(left_rows):
+            done = ends[start - 1] if start else 0
+            stop = max(int(np.searchsorted(ends, done + batch_size, side='right')), start + 1)
+            counts = right_count[start:stop]
+            total = int(ends[stop - 1] - done)
+            if total:
+                pair_left = np.repeat(left_rows[start:stop], counts)
+                output_start = np.repeat(np.cumsum(counts) - counts, counts)
+                pair_right = right_rows[np.repeat(right_start[start:stop], counts) + np.arange(total) - output_start]
+                yield pair_left, pair_right
+            start = stop
+    
+    def _group_rows(self, key_ids, group_ids):
+        """Rows belonging to the given groups and the position of their group in group_ids"""
+        group_of = np.full(key_ids.max() + 1 if len(key_ids) else 0, -1, dtype=np.int64)
+        group_of[group_ids] = np.arange(len(group_ids))
+        rows = np.flatnonzero(group_of[key_ids] >= 0) if len(key_ids) else np.empty(0, dtype=np.int64)
+        return rows, group_of[key_ids[rows]]
+    
+    def group_counts(self, key_ids, group_ids):
+        """Number of rows of every group (rows) in every source (columns)"""
+        rows, groups = self._group_rows(key_ids, group_ids)
+        n_sources = len(self.sources)
+        counts = np.bincount(groups * n_sources + self.source_codes[rows], minlength=len(group_ids) * n_sources)
+        return counts.reshape(len(group_ids), n_sources)
+    
+    def key_summary(self, key_ids, group_ids):
+        """
+        Price statistics of every group and source in one grouped pass:
+        count, min, max and median price and the cheapest row (first in input order on ties)
+        """
+        rows, groups = self._group_rows(key_ids, group_ids)
+        frame = pd.DataFrame({'group': groups, 'source': self.source_codes[rows], 'price': self.price[rows], 'row': rows})
+        grouped = frame.groupby(['group', 'source'], sort=True)['price']
+        summary = grouped.agg(['count', 'min', 'max', 'median']).reset_index()
+        summary['cheapest_row'] = rows[grouped.idxmin().to_numpy()]
+        summary['match_key'] = [self.match_keys[code] for code in self.match_key_codes[summary['cheapest_row']]]
+        summary['source'] = [self.sources[code] for code in summary['source']]
+        return summary
+    
+    def compare_summaries(self, summary, left_source, right_source, groups=None):
+        """
+        Aggregated comparison of two sources: one row per key present in both, ordered by match_key
+        Prices are compared on the cheapest product of each side; pairs is the size of the
+        Cartesian product that pairwise matching would have produced for the key.
+        groups optionally restricts the comparison to some positions in group_ids.
+        """
+        if groups is not None:
+            summary = summary[summary['group'].isin(groups)]
+        columns = ['group', 'match_key', 'count', 'min', 'max', 'median', 'cheapest_row']
+        left = summary.loc[summary['source'] == left_source, columns]
+        right = summary.loc[summary['source'] == right_source, columns].drop(columns='match_key')
+        comparison = left.merge(right, on='group', suffixes=('_left', '_right'))
+        
+        result = pd.DataFrame({
+            'match_key': comparison['match_key'],
+            'left_source': left_source,
+            'left_count': comparison['count_left'],
+            'left_min': comparison['min_left'],
+            'left_median': comparison['median_left'],
+            'left_max': comparison['max_left'],
+            'left_cheapest': [self.name(row) for row in comparison['cheapest_row_left']],
+            'right_source': right_source,
+            'right_count': comparison['count_right'],
+            'right_min': comparison['min_right'],
+            'right_median': comparison['median_right'],
+            'right_max': comparison['max_right'],
+            'right_cheapest': [self.name(row) for row in comparison['cheapest_row_right']],
+        })
+        result['pairs'] = result['left_count'] * result['right_count']
+        result['price_difference'] = result['left_min'] - result['right_min']
+        result['price_difference_percent'] = np.where(
+            result['right_min'] > 0, result['price_difference'] / result['right_min'] * 100, 0.0)
+        return result.sort_values('match_key', kind='stable').reset_index(drop=True)
+    
+    def match_record(self, left_row, right_row):
+        """One match as a dict with the MATCH_FIELDS keys"""
+        parsed = self.parsed(left_row)
+        left_price = float(self.price[left_row])
+        right_price = float(self.price[right_row])
+        price_diff = left_price - right_price
+        price_diff_percent = (price_diff / right_price) * 100 if right_price > 0 else 0
+        
+        return {
+            'match_key': parsed.match_key,
+            'brand': parsed.brand,
+            'flavor': ', '.join(parsed.flavor) if parsed.flavor else 'N/A',
+            'volume_str': parsed.volume_str,
+            'volume_ml': parsed.volume_ml,
+            'is_package': parsed.is_package,
+            'package_count': parsed.package_count,
+            'left_source': self.sources[self.source_codes[left_row]],
+            'left_original': self.original_name(left_row),
+            'left_name': self.name(left_row),
+            'left_price': left_price,
+            'right_source': self.sources[self.source_codes[right_row]],
+            'right_original': self.original_name(right_row),
+            'right_name': self.name(right_row),
+            'right_price': right_price,
+            'price_difference': price_diff,
+            'price_difference_percent': price_diff_percent
+        }
+    
+    def match_batch(self, left_rows, right_rows):
+        """Match records of row pairs as columns (MATCH_FIELDS -> list or array)"""
+        flavor_labels = [', '.join(flavor) if flavor else 'N/A' for flavor in self.flavors]
+        price_diff, price_diff_percent = self.price_differences(left_rows, right_rows)
+        volume_codes = self.volume_codes[left_rows]
+        
+        return {
+            'match_key': [self.match_keys[code] for code in self.match_key_codes[left_rows]],
+            'brand': [self.brands[code] for code in self.brand_codes[left_rows]],
+            'flavor': [flavor_labels[code] for code in self.flavor_codes[left_rows]],
+            'volume_str': [self.volume_strs[code] if code >= 0 else None for code in volume_codes],
+            'volume_ml': [_optional_int(value) for value in self.volume_ml[left_rows]],
+            'is_package': self.is_package[left_rows],
+            'package_count': [_optional_int(value) for value in self.package_count[left_rows]],
+            'left_source': [self.sources[code] for code in self.source_codes[left_rows]],
+            'left_original': [self.strings[code] for code in self.original_codes[left_rows]],
+            'left_name': [self.strings[code] for code in self.name_codes[left_rows]],
+            'left_price': self.price[left_rows],
+            'right_source': [self.sources[code] for code in self.source_codes[right_rows]],
+            'right_original': [self.strings[code] for code in self.original_codes[right_rows]],
+            'right_name': [self.strings[code] for code in self.name_codes[right_rows]],
+            'right_price': self.price[right_rows],
+            'price_difference': price_diff,
+            'price_difference_percent': price_diff_percent,
+        }
+    
+    def price_differences(self, left_rows, right_rows):
+        """Vectorized price_difference and price_difference_percent of row pairs"""
+        left_price = self.price[left_rows]
+        right_price = self.price[right_rows]
+        price_diff = left_price - right_price
+        with np.errstate(divide='ignore', invalid='ignore'):
+            percent = np.where(right_price > 0, (price_diff / right_price) * 100, 0.0)
+        return price_diff, percent
+    
+    def price_matrix(self, key_ids, group_ids):
+        """
+        Price matrix indexed by match_key: cheapest price of each source, overall min/max, spread and
+        cheapest source, over the rows of groups present in at least two sources
+        """
+        n_sources = len(self.sources)
+        in_group = np.isin(key_ids, group_ids)
+        rows = np.flatnonzero(in_group)
+        
+        # Skupine z istim match_key (npr. več kot 3 okusi) združimo v eno vrstico matrike
+        key_codes, match_key_codes = pd.factorize(self.match_key_codes[rows])
+        prices = np.full(len(match_key_codes) * n_sources, np.inf)
+        np.minimum.at(prices, key_codes * n_sources + self.source_codes[rows], self.price[rows])
+        prices = prices.reshape(len(match_key_codes), n_sources)
+        prices[np.isinf(prices)] = np.nan
+        match_keys = [self.match_keys[code] for code in match_key_codes]
+        
+        matrix = pd.DataFrame(prices, columns=self.sources, index=pd.Index(match_keys, name='match_key'))
+        source_prices = matrix[self.sources]
+        matrix['min'] = source_prices.min(axis=1)
+        matrix['max'] = source_prices.max(axis=1)
+        matrix['spread'] = matrix['max'] - matrix['min']
+        matrix['cheapest'] = source_prices.idxmin(axis=1) if len(matrix) else pd.Series(dtype=object)
+        
+        return matrix.sort_index()
+
+def _optional_int(value):
+    return None if value == MISSING else int(value)
@@ -0,0 +1,373 @@
+"""Command line entry point of the price comparison"""
+import argparse
+import os
+from itertools import combinations
+
+from .metrics import METRICS, write_metrics
+from .normalize import standardize_cache_info
+from .sources import SOURCES, SourceConfig
+
+# Privzeto število izpisanih ujemanj; rangiranje hrani samo toliko parov, ne vseh ujemanj
+REPORT_TOP = 100
+# Število izpisanih ključev z največjim razponom cen
+SPREAD_TOP = 10
+
+def _print_key_comparison(i, row):
+    """Print one row of Catalog.compare_summaries"""
+    print(f"\n{i}. {row['match_key']} ({row['left_source']} {row['left_count']}x, {row['right_source']} {row['right_count']}x, {row['pairs']} parov)")
+    for side in ('left', 'right'):
+        print(f"   {row[side + '_source'] + ':':<10}min €{row[side + '_min']:.2f}, mediana €{row[side + '_median']:.2f}, "
+              f"max €{row[side + '_max']:.2f}")
+        print(f"             najcenejši: {row[side + '_cheapest'][:60]}")
+    if row['price_difference'] > 0.01:
+        print(f"   → {row['right_source']} je CENEJŠI za €{abs(row['price_difference']):.2f} ({abs(row['price_difference_percent']):.1f}%)")
+    elif row['price_difference'] < -0.01:
+        print(f"   → {row['left_source']} je CENEJŠI za €{abs(row['price_difference']):.2f} ({abs(row['price_difference_percent']):.1f}%)")
+
+def _print_price_spreads(price_matrix, top=SPREAD_TOP, file=None):
+    """Print the keys of Catalog.price_matrix with the largest spread between the lowest and highest price"""
+    for i, (key, row) in enumerate(price_matrix.sort_values('spread', ascending=False, kind='stable').head(top).iterrows(), 1):
+        print(f"{i}. {key}: min €{row['min']:.2f} ({row['cheapest']}), max €{row['max']:.2f}, razlika €{row['spread']:.2f}", file=file)
+
+def _print_match(i, match, file=None):
+    """Print one record of Catalog.match_record"""
+    package_info = f"PAKET {match['package_count']}x" if match['is_package'] else "POSAMEZNI"
+    print(f"\n{i}. {match['brand']} - {match['flavor']} - {package_info} {match['volume_str']}", file=file)
+    print(f"   {match['left_source'] + ':':<10}{match['left_name'][:70]}...", file=file)
+    print(f"            €{match['left_price']:.2f}", file=file)
+    print(f"   {match['right_source'] + ':':<10}{match['right_name'][:70]}...", file=file)
+    print(f"            €{match['right_price']:.2f}", file=file)
+    
+    if match['price_difference'] > 0.01:
+        print(f"   → {match['right_source']} je CENEJŠI za €{abs(match['price_difference']):.2f} ({abs(match['price_difference_percent']):.1f}%)", file=file)
+    elif match['price_difference'] < -0.01:
+        print(f"   → {match['left_source']} je CENEJŠI za €{abs(match['price_difference']):.2f} ({abs(match['price_difference_percent']):.1f}%)", file=file)
+    
+    # Prikažemo match key za debugging
+    print(f"   Match key: {match['match_key']}", file=file)
+    
+    # Če gre za blood orange izdelek, to posebej označimo
+    if 'BLOOD' in match['left_name'].upper() or 'BLOOD' in match['right_name'].upper():
+        print("   ⚠️  Opomba: BLOOD ORANGE izdelek (standardiziran kot POMARANCA)", file=file)
+
+def capped_output_path(path):
+    """Sibling file for per-key summaries of keys over --max-pairs-per-key: ujemanja.csv -> ujemanja.capped.csv"""
+    root, extension = os.path.splitext(path)
+    return f"{root}.capped{extension}"
+
+def _positive_int(value):
+    """argparse type: integer >= 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"mora biti vsaj 1, ne {value}")
+    return number
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        prog='primerjava',
+        description='Primerjava cen izdelkov med trgovinami.',
+    )
+    parser.add_argument('--source', nargs=4, action='append',
+                        metavar=('NAME', 'PATH', 'NAME_COLUMN', 'PRICE_COLUMN'),
+                        help='trgovina za primerjavo (lahko večkrat); privzeto Spar in Mercator')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='število procesov za razčlenjevanje imen (privzeto vsa jedra)')
+    parser.add_argument('--chunk-size', type=_positive_int, default=None,
+                        help='število imen v enem kosu za vzporedno razčlenjevanje')
+    parser.add_argument('--parse-cache', metavar='PATH', default=None,
+                        help='datoteka predpomnilnika razčlenjenih imen')
+    parser.add_argument('--no-parse-cache', action='store_true',
+                        help='ne uporabljaj predpomnilnika razčlenjenih imen')
+    parser.add_argument('--snapshot-dir', metavar='DIR', default=None,
+                        help='mapa s stolpčnimi posnetki Excel datotek')
+    parser.add_argument('--no-snapshots', action='store_true',
+                        help='vedno beri Excel datoteke neposredno')
+    parser.add_argument('--output', metavar='PATH', default=None,
+                        help='zapiši vsa natančna ujemanja v datoteko (.csv, .jsonl ali .parquet)')
+    parser.add_argument('--output-format', choices=['csv', 'jsonl', 'parquet'], default=None,
+                        help='oblika izhodne datoteke (privzeto glede na končnico)')
+    parser.add_argument('--top', type=_positive_int, default=REPORT_TOP, metavar='N',
+                        help=f'izpiši samo N ujemanj z največjo razliko v ceni (privzeto {REPORT_TOP}; '
+                             'vsa ujemanja zapiše --output)')
+    parser.add_argument('--compare', choices=['pairs', 'aggregate'], default='pairs',
+                        help='pairs: vsak par izdelkov; aggregate: povzetek cen po ključu (min, mediana, max, število)')
+    parser.add_argument('--max-pairs-per-key', type=_positive_int, default=None, metavar='N',
+                        help='ključe z več kot N pari primerjaj agregirano namesto po parih '
+                             '(z --output se povzetki zapišejo v <ime>.capped.<končnica>)')
+    parser.add_argument('--deals', type=int, default=10, metavar='K',
+                        help='število najboljših ponudb na liter v poročilu (0 = brez)')
+    parser.add_argument('--artifact', metavar='DIR', default=None,
+                        help='zapiši izdelke in ujemanja za spletni vmesnik (app.js) v mapo')
+    parser.add_argument('--metrics', metavar='PATH', default=None,
+                        help='zapiši meritve stopenj in števce pravil (.prom/.txt za Prometheus, sicer JSON)')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Run the whole comparison of all configured stores; returns the exit code"""
+    args = parse_args(argv)
+    sources = [SourceConfig(*values) for values in args.source] if args.source else SOURCES
+    
+    # Težke odvisnosti (pandas, numpy) naložimo šele, ko res poganjamo primerjavo
+    import numpy as np
+    import pandas as pd
+
+    from .cache import PARSE_CACHE_PATH, ParseCache
+    from .catalog import MATCH_FIELDS, Catalog
+    from .query import CatalogIndex, difference
+    from .fuzzy import FUZZY_THRESHOLD, fuzzy_match
+    from .ingest import PARSE_CHUNK_SIZE, PARSE_WORKERS, ingest_products
+    from .snapshot import SNAPSHOT_DIR, read_source
+    from .unitprice import UnitPriceIndex
+    from .writers import TopN, open_writer
+    
+    snapshot_dir = None if args.no_snapshots else (args.snapshot_dir or SNAPSHOT_DIR)
+    workers = args.workers if args.workers is not None else PARSE_WORKERS
+    chunk_size = args.chunk_size or PARSE_CHUNK_SIZE
+    
+    print("Reading and preparing data...")
+    try:
+        with METRICS.stage('read'):
+            source_dfs = {config.source: read_source(config, snapshot_dir) for config in sources}
+    except FileNotFoundError as e:
+        print(f"Napaka pri branju datotek: {e}")
+        print(f"Preveri, da so datoteke {', '.join(repr(config.path) for config in sources)} v isti mapi.")
+        return 1
+
+    for source, df in source_dfs.items():
+        print(f"Original {source} rows: {len(df)}")
+        METRICS.add_rows('read', len(df))
+
+    # Prepare products - celotne stolpce obdelamo naenkrat
+    print()
+    frames = {}
+    parse_cache = None if args.no_parse_cache else ParseCache(args.parse_cache or PARSE_CACHE_PATH)
+    try:
+        for config in sources:
+            print(f"Processing {config.source} products...")
+            frames[config.source] = ingest_products(source_dfs[config.source], config.name_column,
+                                                    config.price_column, config.source,
+                                                    cache=parse_cache, workers=workers, chunk_size=chunk_size)
+    finally:
+        if parse_cache is not None:
+            parse_cache.close()
+
+    # Vse trgovine zložimo v en stolpčni katalog
+    with METRICS.stage('catalog', sum(len(frame) for frame in frames.values())):
+        catalog = Catalog(frames)
+    del frames, source_dfs
+
+    with METRICS.stage('catalog_index', len(catalog)):
+        catalog_index = CatalogIndex(catalog)
+
+    print()
+    for source in catalog.sources:
+        print(f"Processed {source} products: {len(catalog.rows_of(source))}")
+
+    cache_info = standardize_cache_info()
+    print(f"Standardize cache: {cache_info.hits} hits, {cache_info.misses} misses")
+    if parse_cache is not None:
+        print(f"Parse cache: {parse_cache.hits} hits, {parse_cache.misses} misses")
+
+    # Show some examples of how products are categorized
+    print("\n" + "="*80)
+    print("PRIMERI KATEGORIZACIJE IZDELKOV (Posebna pozornost na BLOOD ORANGE):")
+    print("="*80)
+
+    # Prikažemo posebej Blood Orange izdelke
+    blood_orange_rows = catalog_index.name_contains('BLOOD', 'ORANGE')
+
+    if len(blood_orange_rows):
+        print(f"\nNajdenih {len(blood_orange_rows)} BLOOD ORANGE izdelkov (standardizirani kot POMARANCA):")
+        for i, product in enumerate(catalog.products(blood_orange_rows[:10])):
+            package_type = "PAKET" if product.parsed.is_package else "POSAMEZNI"
+            flavors = ', '.join(product.parsed.flavor) if product.parsed.flavor else 'Brez okusa'
+            print(f"{i+1}. {package_type}: {product.parsed.brand} - {flavors}")
+            print(f"   Ime: {product.name[:70]}...")
+            print(f"   Volume: {product.parsed.volume_str}, Match key: {product.parsed.match_key}")
+            print()
+
+    # Pokažemo tudi standardne pomarančne izdelke za primerjavo
+    orange_rows = difference(catalog_index.flavor('POMARANCA'), blood_orange_rows)
+
+    if len(orange_rows):
+        print(f"\nNajdenih {len(orange_rows)} drugih POMARANČNIH izdelkov:")
+        for i, product in enumerate(catalog.products(orange_rows[:5])):
+            package_type = "PAKET" if product.parsed.is_package else "POSAMEZNI"
+            flavors = ', '.join(product.parsed.flavor) if product.parsed.flavor else 'Brez okusa'
+            print(f"{i+1}. {package_type}: {product.parsed.brand} - {flavors}")
+            print(f"   Ime: {product.name[:70]}...")
+            print(f"   Volume: {product.parsed.volume_str}, Match key: {product.parsed.match_key}")
+            print()
+
+    # Find matches by match_key
+    print("\n" + "="*80)
+    print("ISKANJE UJEMANJ Z RAZLIČNIMI CENAMI:")
+    print("="*80)
+
+    # Vse trgovine razdelimo po ključu v enem prehodu (hash join)
+    source_names = [config.source for config in sources]
+    with METRICS.stage('group', len(catalog)):
+        key_ids, group_ids = catalog.group_keys()
+        in_group = np.isin(key_ids, group_ids)
+
+    # Find common keys - match_key v vsaj dveh trgovinah, kot presek množic ključev v izvirniku
+    n_sources = max(len(catalog.sources), 1)
+    key_sources = np.unique(catalog.match_key_codes.astype(np.int64) * n_sources + catalog.source_codes)
+    key_codes, source_counts = np.unique(key_sources // n_sources, return_counts=True)
+    common_keys = {catalog.match_keys[code] for code in key_codes[source_counts >= 2]}
+    print(f"\nNajdenih {len(common_keys)} izdelkov z ujemajočo znamko+okusom+volumnom")
+
+    if common_keys:
+        print("\nPrvih 10 skupnih match ključev:")
+        for i, key in enumerate(sorted(common_keys)[:10]):
+            print(f"{i+1}. {key}")
+
+    # Povzetki cen po ključu (O(n)) za agregirano primerjavo in za ključe nad omejitvijo parov
+    aggregate = args.compare == 'aggregate'
+    capped_comparisons = []
+    if aggregate or args.max_pairs_per_key is not None:
+        with METRICS.stage('key_summary', len(catalog)):
+            summary = catalog.key_summary(key_ids, group_ids)
+            group_counts = catalog.group_counts(key_ids, group_ids)
+
+    if aggregate:
+        comparisons = [catalog.compare_summaries(summary, left_source, right_source)
+                       for left_source, right_source in combinations(source_names, 2)]
+        comparison = pd.concat(comparisons, ignore_index=True)
+        print(f"\nAgregirana primerjava: {len(comparison)} ključev, ki bi dali {comparison['pairs'].sum()} parov")
+        if args.output:
+            with open_writer(args.output, list(comparison.columns), args.output_format) as writer:
+                writer.write_batch({column: comparison[column].to_numpy() for column in comparison.columns})
+            print(f"Primerjava zapisana v {args.output} ({writer.rows_written} vrstic)")
+    elif args.max_pairs_per_key is not None:
+        for left_code, right_code in combinations(range(len(source_names)), 2):
+            pairs = group_counts[:, left_code] * group_counts[:, right_code]
+            capped = np.flatnonzero(pairs > args.max_pairs_per_key)
+            if len(capped):
+                capped_comparisons.append(catalog.compare_summaries(
+                    summary, source_names[left_code], source_names[right_code], groups=capped))
+        # Ključi nad omejitvijo niso med ujemanji, zato njihove povzetke zapišemo poleg izhodne datoteke
+        if args.output and capped_comparisons:
+            capped = pd.concat(capped_comparisons, ignore_index=True)
+            capped_path = capped_output_path(args.output)
+            with open_writer(capped_path, list(capped.columns), args.output_format) as capped_writer:
+                capped_writer.write_batch({column: capped[column].to_numpy() for column in capped.columns})
+            print(f"Povzetki {len(capped)} ključev nad omejitvijo parov zapisani v {capped_path}")
+
+    # Ujemanja za vsak par trgovin obdelamo v paketih: zapis v datoteko in rangiranje
+    # po razliki v ceni brez celotnega seznama ujemanj v pomnilniku
+    writer = open_writer(args.output, MATCH_FIELDS, args.output_format) if args.output and not aggregate else None
+    ranking = TopN(args.top)
+    match_count = 0
+    different_count = 0
+    try:
+        with METRICS.stage('match', len(group_ids)):
+            for left_source, right_source in ([] if aggregate else combinations(source_names, 2)):
+                for left_rows, right_rows in catalog.iter_pair_batches(key_ids, group_ids, left_source, right_source,
+                                                                       max_pairs_per_key=args.max_pairs_per_key):
+                    match_count += len(left_rows)
+                    if writer is not None:
+                        writer.write_batch(catalog.match_batch(left_rows, right_rows))
+                    
+                    # Filter matches with DIFFERENT price (difference more than 0.01)
+                    price_differences, price_difference_percents = catalog.price_differences(left_rows, right_rows)
+                    different = np.flatnonzero(np.abs(price_differences) > 0.01)
+                    different_count += len(different)
+                    ranking.push_many(np.abs(price_difference_percents[different]),
+                                      list(zip(left_rows[different].tolist(), right_rows[different].tolist())))
+    finally:
+        if writer is not None:
+            writer.close()
+    METRICS.add_rows('match_pairs', match_count)
+
+    if not aggregate:
+        print(f"\nVeljavna natančna ujemanja najdena: {match_count}")
+    if writer is not None:
+        print(f"Ujemanja zapisana v {args.output} ({writer.rows_written} vrstic)")
+
+    with METRICS.stage('price_matrix', len(group_ids)):
+        price_matrix = catalog.price_matrix(key_ids, group_ids)
+    if len(price_matrix):
+        print(f"\nCenovna matrika: {len(price_matrix)} ključev z natančnim ujemanjem v vsaj dveh trgovinah")
+        print("Največje razlike med najnižjo in najvišjo ceno:")
+        _print_price_spreads(price_matrix)
+
+    if args.artifact:
+        from .artifact import write_artifact
+        with METRICS.stage('artifact', len(catalog)):
+            manifest = write_artifact(catalog, key_ids, group_ids, args.artifact)
+        chunk_count = len(manifest['matches']['chunks']) + sum(len(source['chunks']) for source in manifest['sources'])
+        print(f"\nArtefakt zapisan v {args.artifact} ({manifest['matches']['rows']} ujemanj, {chunk_count} kosov)")
+
+    # Razvrščeno po največji razliki v ceni
+    different_price_matches = [catalog.match_record(left_row, right_row) for left_row, right_row in ranking.items()]
+
+    # Display results - ONLY DIFFERENT PRICE MATCHES
+    if aggregate:
+        different = comparison[comparison['price_difference'].abs() > 0.01]
+        different = different.iloc[np.argsort(-different['price_difference_percent'].abs().to_numpy(), kind='stable')]
+        print("\n" + "="*80)
+        print(f"KLJUČI Z RAZLIČNIMI NAJNIŽJIMI CENAMI ({len(different)} najdenih):")
+        print("="*80)
+        for i, (_, row) in enumerate(different.head(args.top).iterrows(), 1):
+            _print_key_comparison(i, row)
+    elif different_price_matches:
+        print("\n" + "="*80)
+        print(f"UJEMANJA Z RAZLIČNIMI CENAMI ({different_count} najdenih):")
+        print("="*80)
+        if len(different_price_matches) < different_count:
+            print(f"Prikazanih {len(different_price_matches)} z največjo razliko v ceni")
+    
+        for i, match in enumerate(different_price_matches, 1):
+            _print_match(i, match)
+    else:
+        print("\nNi najdenih ujemanj z različnimi cenami.")
+
+    if capped_comparisons:
+        capped = pd.concat(capped_comparisons, ignore_index=True)
+        print("\n" + "="*80)
+        print(f"KLJUČI Z VEČ KOT {args.max_pairs_per_key} PARI (primerjani agregirano, {len(capped)} ključev):")
+        print("="*80)
+        for i, (_, row) in enumerate(capped.iterrows(), 1):
+            _print_key_comparison(i, row)
+
+    # Približna ujemanja za izdelke, ki nimajo natančnega para v nobeni drugi trgovini
+    print("\n" + "="*80)
+    print("MOŽNA PRIBLIŽNA UJEMANJA (izdelki brez natančnega ujemanja):")
+    print("="*80)
+
+    unmatched_by_source = {
+        source: catalog.products(np.flatnonzero(~in_group & (catalog.source_codes == code)))
+        for code, source in enumerate(catalog.sources)
+    }
+    fuzzy_matches = []
+    with METRICS.stage('fuzzy', sum(len(products) for products in unmatched_by_source.values())):
+        for left_source, right_source in combinations(source_names, 2):
+            fuzzy_matches.extend(fuzzy_match(unmatched_by_source[left_source], unmatched_by_source[right_source]))
+    fuzzy_matches.sort(key=lambda result: -result[2])
+
+    print(f"\nNajdenih {len(fuzzy_matches)} možnih približnih ujemanj (podobnost >= {FUZZY_THRESHOLD})")
+    for i, (left_product, right_product, score) in enumerate(fuzzy_matches[:10], 1):
+        print(f"\n{i}. Podobnost {score:.2f}")
+        print(f"   {left_product.source + ':':<10}{left_product.name[:70]} (€{left_product.price:.2f})")
+        print(f"   {right_product.source + ':':<10}{right_product.name[:70]} (€{right_product.price:.2f})")
+
+    if args.deals > 0:
+        print("\n" + "="*80)
+        print("NAJBOLJŠE PONUDBE NA LITER (glede na mediano €/L iste znamke in okusa):")
+        print("="*80)
+
+        with METRICS.stage('unit_price_index', len(catalog)):
+            unit_price_index = UnitPriceIndex(catalog)
+        for i, deal in enumerate(unit_price_index.best_deals(args.deals), 1):
+            package_info = f"PAKET {deal['package_count']}x" if deal['is_package'] else "POSAMEZNI"
+            print(f"\n{i}. {deal['brand']} - {deal['flavor_key']} - {package_info} ({deal['source']})")
+            print(f"   {deal['name'][:70]}")
+            print(f"   €{deal['price']:.2f} = €{deal['unit_price']:.2f}/L, {deal['discount']:.0%} pod mediano")
+
+    if args.metrics:
+        write_metrics(args.metrics)
+        print(f"\nMeritve zapisane v {args.metrics}")
+
+    return 0
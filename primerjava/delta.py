@@ -0,0 +1,247 @@
+"""Incremental runs: diff the inputs against the previous run and re-match only what changed"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from .cache import PARSE_CACHE_PATH, ParseCache
+from .catalog import MATCH_FIELDS, Catalog
+from .ingest import PRODUCT_COLUMNS, clean_prices, parse_names_parallel
+from .metrics import METRICS
+from .parsing import ParsedProduct
+from .snapshot import SNAPSHOT_DIR, read_source
+from .sources import SOURCES, SourceConfig
+from .writers import open_writer
+
+# Mapa s stanjem prejšnjega zagona (vrstice s parsanimi polji in indeks ujemanj)
+DELTA_STATE_DIR = '.delta_state'
+
+# Vrstico vhoda določa (trgovina, originalno ime, zaporedna številka enakega imena)
+ROW_KEY = ['source', 'original_name', 'occurrence']
+MATCH_ID = ['left_source', 'left_original', 'left_occurrence', 'right_source', 'right_original', 'right_occurrence']
+
+# Manjše spremembe razlike v ceni so šum plavajoče vejice
+PRICE_CHANGE_EPSILON = 1e-9
+
+_PARSED_FIELDS = ['name', *ParsedProduct.__slots__]
+_MATCH_TYPES = {'volume_ml': 'Int64', 'package_count': 'Int64'}
+
+def input_rows(config, df):
+    """Raw rows of one source: source, original_name, occurrence, raw_price (rows without a name are skipped)"""
+    if config.name_column not in df.columns or config.price_column not in df.columns:
+        return pd.DataFrame({column: pd.Series(dtype=object) for column in [*ROW_KEY, 'raw_price']})
+    
+    names = df[config.name_column]
+    rows = pd.DataFrame({
+        'source': config.source,
+        'original_name': names.astype(str).to_numpy(dtype=object),
+        'raw_price': df[config.price_column].astype(object).where(df[config.price_column].notna(), None).to_numpy(),
+    })[names.notna().to_numpy()]
+    rows['occurrence'] = rows.groupby('original_name', sort=False).cumcount()
+    return rows[[*ROW_KEY, 'raw_price']].reset_index(drop=True)
+
+def diff_inputs(old_rows, new_rows):
+    """
+    Join old and new raw rows on ROW_KEY
+    Returns the new rows with a 'status' column (added, changed, unchanged) and the removed old rows.
+    """
+    merged = new_rows.merge(old_rows[[*ROW_KEY, 'raw_price']], on=ROW_KEY, how='outer',
+                            suffixes=('', '_old'), indicator=True, sort=False)
+    removed = merged['_merge'] == 'right_only'
+    present = merged[~removed].copy()
+    
+    same_price = ((present['raw_price'] == present['raw_price_old'])
+                  | (present['raw_price'].isna() & present['raw_price_old'].isna()))
+    present['status'] = np.where(present['_merge'] == 'left_only', 'added', np.where(same_price, 'unchanged', 'changed'))
+    return (present.drop(columns=['raw_price_old', '_merge']).reset_index(drop=True),
+            merged.loc[removed, ROW_KEY].reset_index(drop=True))
+
+def _parse_rows(rows, cache, workers):
+    """Price and parsed fields of raw rows; 'valid' is False where ingest_products would drop the row"""
+    unique_names = list(dict.fromkeys(rows['original_name']))
+    parsed = cache.parse_names(unique_names, workers) if cache is not None else parse_names_parallel(unique_names, workers)
+    positions = pd.Index(unique_names).get_indexer(rows['original_name'])
+    
+    result = pd.DataFrame({field: parsed[field].to_numpy(dtype=object)[positions] for field in _PARSED_FIELDS},
+                          index=rows.index)
+    result['price'] = clean_prices(pd.Series(rows['raw_price'].to_numpy(), index=rows.index, dtype=object))
+    result['valid'] = result['price'].notna() & (result['name'] != '')
+    return result
+
+def update_rows(old_state, new_rows, cache=None, workers=1):
+    """
+    New state rows: unchanged rows keep their parsed fields and price, changed rows only
+    get their price cleaned again, added rows are parsed (through the cache when given).
+    Returns (state rows, removed old rows).
+    """
+    with METRICS.stage('delta.diff', len(new_rows)):
+        rows, removed = diff_inputs(old_state, new_rows)
+        fields = [*_PARSED_FIELDS, 'price', 'valid']
+        state = pd.DataFrame(index=rows.index, columns=fields, dtype=object)
+        
+        reuse = (rows['status'] != 'added').to_numpy()
+        if reuse.any():
+            previous = pd.MultiIndex.from_frame(old_state[ROW_KEY])
+            positions = previous.get_indexer(pd.MultiIndex.from_frame(rows.loc[reuse, ROW_KEY]))
+            state.loc[reuse, fields] = old_state[fields].to_numpy(dtype=object)[positions]
+    
+    added = ~reuse
+    with METRICS.stage('delta.parse', int(added.sum())):
+        if added.any():
+            parsed = _parse_rows(rows[added], cache, workers)
+            state.loc[added, parsed.columns] = parsed.to_numpy(dtype=object)
+    
+    # Sprememba cene: ime ostane isto, na novo očistimo samo ceno
+    changed = (rows['status'] == 'changed').to_numpy()
+    if changed.any():
+        prices = clean_prices(pd.Series(rows.loc[changed, 'raw_price'].to_numpy(), dtype=object)).to_numpy()
+        state.loc[changed, 'price'] = prices
+        state.loc[changed, 'valid'] = ~np.isnan(prices) & (state.loc[changed, 'name'] != '').to_numpy()
+    
+    state = pd.concat([rows, state], axis=1)
+    state['valid'] = state['valid'].astype(bool)
+    return state, removed
+
+def _product_frames(state, sources):
+    """Per-source product tables (ingest_products layout) of the valid state rows and their state positions"""
+    frames = {}
+    positions = []
+    for source in sources:
+        rows = np.flatnonzero(((state['source'] == source) & state['valid']).to_numpy())
+        frames[source] = state.iloc[rows][list(PRODUCT_COLUMNS)].astype(PRODUCT_COLUMNS).reset_index(drop=True)
+        positions.append(rows)
+    return frames, np.concatenate(positions) if positions else np.empty(0, dtype=np.int64)
+
+def compute_matches(state, sources, match_keys=None):
+    """Matches of all source pairs (MATCH_FIELDS plus occurrences), optionally only of some match_keys"""
+    if match_keys is not None:
+        state = state[state['match_key'].isin(match_keys)]
+    frames, positions = _product_frames(state, sources)
+    catalog = Catalog(frames)
+    key_ids, group_ids = catalog.group_keys()
+    occurrences = state['occurrence'].to_numpy(dtype=np.int64)[positions]
+    
+    parts = []
+    for i, left_source in enumerate(sources):
+        for right_source in sources[i + 1:]:
+            for left_rows, right_rows in catalog.iter_pair_batches(key_ids, group_ids, left_source, right_source):
+                batch = pd.DataFrame(catalog.match_batch(left_rows, right_rows))
+                batch['left_occurrence'] = occurrences[left_rows]
+                batch['right_occurrence'] = occurrences[right_rows]
+                parts.append(batch)
+    if not parts:
+        return pd.DataFrame(columns=[*MATCH_FIELDS, 'left_occurrence', 'right_occurrence'])
+    # Serije z manjkajočim volumnom dobijo float stolpce; poenotimo tipe, da se stanja med zagoni ujemajo
+    return pd.concat(parts, ignore_index=True).astype(_MATCH_TYPES)
+
+def diff_matches(old_matches, new_matches):
+    """Change set: matches that appeared, disappeared or whose price difference changed"""
+    merged = old_matches.merge(new_matches, on=MATCH_ID, how='outer', suffixes=('_old', ''), indicator=True)
+    fields = [field for field in MATCH_FIELDS if field not in MATCH_ID]
+    lost = merged['_merge'] == 'left_only'
+    for field in fields:
+        merged[field] = merged[field].where(~lost, merged[field + '_old'])
+    
+    difference_change = (merged['price_difference'] - merged['price_difference_old']).abs() > PRICE_CHANGE_EPSILON
+    merged['change'] = np.select([merged['_merge'] == 'right_only', lost, difference_change],
+                                 ['new', 'lost', 'price_change'], default='')
+    changes = merged[merged['change'] != '']
+    return changes[['change', *MATCH_FIELDS, 'left_occurrence', 'right_occurrence', 'price_difference_old']] \
+        .reset_index(drop=True)
+
+def load_state(state_dir):
+    """(state rows, match index) of the previous run, or None"""
+    try:
+        return (pd.read_pickle(os.path.join(state_dir, 'rows.pkl')),
+                pd.read_pickle(os.path.join(state_dir, 'matches.pkl')))
+    except (OSError, ValueError, EOFError):
+        return None
+
+def save_state(state_dir, state, matches):
+    """Store state rows and the match index for the next run"""
+    os.makedirs(state_dir, exist_ok=True)
+    for name, frame in (('rows.pkl', state), ('matches.pkl', matches)):
+        # Zapišemo v začasno datoteko, da prekinjen zagon ne pokvari stanja
+        path = os.path.join(state_dir, name)
+        frame.to_pickle(f"{path}.{os.getpid()}.tmp")
+        os.replace(f"{path}.{os.getpid()}.tmp", path)
+
+def run_delta(sources=SOURCES, state_dir=DELTA_STATE_DIR, snapshot_dir=SNAPSHOT_DIR, cache=None, workers=1):
+    """
+    One incremental run: returns (change set, new state rows, new match index)
+    Without a previous state every row is added and every match is new.
+    """
+    source_names = [config.source for config in sources]
+    new_rows = pd.concat([input_rows(config, read_source(config, snapshot_dir)) for config in sources],
+                         ignore_index=True)
+    
+    previous = load_state(state_dir)
+    if previous is None:
+        old_state = pd.DataFrame(columns=[*ROW_KEY, 'raw_price', *_PARSED_FIELDS, 'price', 'valid'])
+        old_matches = pd.DataFrame(columns=[*MATCH_FIELDS, 'left_occurrence', 'right_occurrence'])
+    else:
+        old_state, old_matches = previous
+    
+    state, removed = update_rows(old_state, new_rows, cache, workers)
+    
+    # Ponovno ujemamo samo ključe vrstic, ki so se pojavile, izginile ali spremenile
+    touched = state[state['status'] != 'unchanged']
+    old_touched = old_state[old_state['valid'].astype(bool)].merge(
+        pd.concat([removed, touched[ROW_KEY]], ignore_index=True), on=ROW_KEY)
+    affected = set(touched.loc[touched['valid'], 'match_key']) | set(old_touched['match_key'])
+    
+    with METRICS.stage('delta.match', len(affected)):
+        recomputed = compute_matches(state, source_names, affected)
+        stale = old_matches['match_key'].isin(affected)
+        changes = diff_matches(old_matches[stale], recomputed)
+        matches = pd.concat([old_matches[~stale], recomputed], ignore_index=True)
+    return changes, state, matches
+
+def main(argv=None):
+    """Command line entry point: python -m primerjava.delta"""
+    parser = argparse.ArgumentParser(prog='primerjava.delta', description='Inkrementalna primerjava cen.')
+    parser.add_argument('--source', nargs=4, action='append',
+                        metavar=('NAME', 'PATH', 'NAME_COLUMN', 'PRICE_COLUMN'),
+                        help='trgovina (lahko večkrat); privzeto Spar in Mercator')
+    parser.add_argument('--state', metavar='DIR', default=DELTA_STATE_DIR, help='mapa s stanjem prejšnjega zagona')
+    parser.add_argument('--output', metavar='PATH', default=None,
+                        help='zapiši spremembe v datoteko (.csv, .jsonl ali .parquet)')
+    parser.add_argument('--dry-run', action='store_true', help='ne shrani novega stanja')
+    parser.add_argument('--no-parse-cache', action='store_true', help='ne uporabi predpomnilnika razčlenjenih imen')
+    parser.add_argument('--workers', type=int, default=1, help='število procesov za razčlenjevanje imen')
+    args = parser.parse_args(argv)
+    
+    sources = [SourceConfig(*values) for values in args.source] if args.source else SOURCES
+    try:
+        if args.no_parse_cache:
+            changes, state, matches = run_delta(sources, args.state, SNAPSHOT_DIR, None, args.workers)
+        else:
+            with ParseCache(PARSE_CACHE_PATH) as cache:
+                changes, state, matches = run_delta(sources, args.state, SNAPSHOT_DIR, cache, args.workers)
+    except FileNotFoundError as e:
+        print(f"Napaka pri branju datotek: {e}")
+        return 1
+    
+    status = state['status'].value_counts()
+    print(f"Vrstic: {len(state)} (novih: {status.get('added', 0)}, spremenjenih: {status.get('changed', 0)}), "
+          f"ujemanj: {len(matches)}")
+    counts = changes['change'].value_counts()
+    print(f"Nova ujemanja: {counts.get('new', 0)}, izgubljena: {counts.get('lost', 0)}, "
+          f"spremenjena razlika v ceni: {counts.get('price_change', 0)}")
+    for _, change in changes.head(20).iterrows():
+        print(f"  {change['change']:<13}{change['match_key']}: {change['left_source']} €{change['left_price']:.2f} / "
+              f"{change['right_source']} €{change['right_price']:.2f}")
+    
+    if args.output:
+        with open_writer(args.output, list(changes.columns)) as writer:
+            # NaN -> None, da pisalci zapišejo prazne vrednosti
+            values = changes.astype(object).where(changes.notna(), None)
+            writer.write_batch({column: values[column].tolist() for column in changes.columns})
+        print(f"Spremembe zapisane v {args.output}")
+    if not args.dry_run:
+        save_state(args.state, state, matches)
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,136 @@
+"""Approximate (MinHash LSH) matching of products without an exact key"""
+import zlib
+
+import numpy as np
+import pandas as pd
+
+# Nastavitve približnega ujemanja (MinHash LSH nad znakovnimi n-grami)
+FUZZY_SHINGLE_SIZE = 3
+FUZZY_NUM_PERM = 48
+FUZZY_BANDS = 16
+FUZZY_THRESHOLD = 0.6
+FUZZY_MAX_BUCKET = 500
+FUZZY_SCORE_CHUNK = 1000000
+
+# Praštevilo, večje od 2^32, za univerzalne zgoščevalne funkcije
+_MINHASH_PRIME = 4294967311
+
+def name_shingles(name, size=FUZZY_SHINGLE_SIZE):
+    """Character n-grams of a standardized name (padded with spaces)"""
+    padded = f" {name} "
+    return frozenset(padded[i:i + size] for i in range(max(len(padded) - size + 1, 1)))
+
+def minhash_signatures(shingle_sets, num_perm=FUZZY_NUM_PERM, seed=1):
+    """MinHash signature matrix (one row per shingle set) computed column by column with numpy"""
+    lengths = np.fromiter((len(shingles) for shingles in shingle_sets), dtype=np.int64, count=len(shingle_sets))
+    signatures = np.empty((len(shingle_sets), num_perm), dtype=np.uint64)
+    if not len(shingle_sets):
+        return signatures
+    
+    # crc32 je determinističen med zagoni (za razliko od hash())
+    hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingles in shingle_sets for shingle in shingles),
+                         dtype=np.uint64, count=int(lengths.sum()))
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2**31, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, 2**32, size=num_perm, dtype=np.uint64)
+    for perm in range(num_perm):
+        permuted = (a[perm] * hashes + b[perm]) % np.uint64(_MINHASH_PRIME)
+        signatures[:, perm] = np.minimum.reduceat(permuted, offsets)
+    
+    return signatures
+
+def _fuzzy_blocks(products):
+    """Blocking key of each product: package flag and total volume"""
+    return [(product.parsed.is_package, product.parsed.volume_ml) for product in products]
+
+def _brand_codes(products):
+    """Brand code of each product, -1 for NOBRAND"""
+    brands = [product.parsed.brand for product in products]
+    codes, _ = pd.factorize(pd.Series(brands, dtype=object))
+    codes[np.fromiter((brand == 'NOBRAND' for brand in brands), dtype=bool, count=len(brands))] = -1
+    return codes
+
+def _flavors_conflict(left_product, right_product):
+    """Both products have known flavors and none of them is shared"""
+    left_flavor, right_flavor = left_product.parsed.flavor, right_product.parsed.flavor
+    return bool(left_flavor) and bool(right_flavor) and not set(left_flavor) & set(right_flavor)
+
+def _band_keys(signatures, block_codes, bands):
+    """One hash per (block, band) for every signature row"""
+    rows_per_band = signatures.shape[1] // bands
+    keys = []
+    for band in range(bands):
+        key = block_codes.astype(np.uint64)
+        for column in range(band * rows_per_band, (band + 1) * rows_per_band):
+            key = key * np.uint64(1000003) ^ signatures[:, column]
+        keys.append(key)
+    return keys
+
+def fuzzy_match(left_products, right_products, threshold=FUZZY_THRESHOLD, num_perm=FUZZY_NUM_PERM,
+                bands=FUZZY_BANDS, max_bucket=FUZZY_MAX_BUCKET):
+    """
+    Find near-duplicate products between two stores without comparing all pairs
+    Candidates must share volume and package flag and collide in at least one LSH band;
+    they are scored by the MinHash estimate of the Jaccard similarity of their name n-grams.
+    Pairs with two known, different brands (not NOBRAND) or two known flavors without a common
+    flavor are different products, not near-duplicates, and are rejected.
+    Returns a list of (left_product, right_product, score) sorted by descending score.
+    """
+    if not left_products or not right_products:
+        return []
+    
+    # Vsako različno ime obdelamo samo enkrat
+    name_index = {}
+    for product in list(left_products) + list(right_products):
+        name_index.setdefault(product.name, len(name_index))
+    signatures = minhash_signatures([name_shingles(name) for name in name_index], num_perm)
+    
+    block_codes, _ = pd.factorize(pd.Series(_fuzzy_blocks(left_products) + _fuzzy_blocks(right_products), dtype=object))
+    left_rows = np.fromiter((name_index[product.name] for product in left_products), dtype=np.int64)
+    right_rows = np.fromiter((name_index[product.name] for product in right_products), dtype=np.int64)
+    left_keys = _band_keys(signatures[left_rows], block_codes[:len(left_products)], bands)
+    right_keys = _band_keys(signatures[right_rows], block_codes[len(left_products):], bands)
+    
+    brand_codes = _brand_codes(list(left_products) + list(right_products))
+    left_brands, right_brands = brand_codes[:len(left_products)], brand_codes[len(left_products):]
+    
+    # Kandidati so pari, ki padejo v isto vedro v vsaj enem pasu (prevelika vedra izpustimo)
+    # Vsak pas ocenimo takoj, da v pomnilniku ni nikoli več kot en pas kandidatov
+    accepted_left = []
+    accepted_right = []
+    accepted_scores = []
+    for left_key, right_key in zip(left_keys, right_keys):
+        left = pd.DataFrame({'key': left_key, 'left': np.arange(len(left_products))})
+        right = pd.DataFrame({'key': right_key, 'right': np.arange(len(right_products))})
+        left = left[left['key'].map(left['key'].value_counts()) <= max_bucket]
+        right = right[right['key'].map(right['key'].value_counts()) <= max_bucket]
+        pairs = left.merge(right, on='key')
+        
+        # Podobnost ocenimo z deležem enakih vrednosti v MinHash podpisih (vektorsko, po kosih)
+        left_candidates = pairs['left'].to_numpy()
+        right_candidates = pairs['right'].to_numpy()
+        for start in range(0, len(left_candidates), FUZZY_SCORE_CHUNK):
+            left_chunk = left_candidates[start:start + FUZZY_SCORE_CHUNK]
+            right_chunk = right_candidates[start:start + FUZZY_SCORE_CHUNK]
+            scores = (signatures[left_rows[left_chunk]] == signatures[right_rows[right_chunk]]).mean(axis=1)
+            left_brand, right_brand = left_brands[left_chunk], right_brands[right_chunk]
+            keep = (scores >= threshold) & ((left_brand < 0) | (right_brand < 0) | (left_brand == right_brand))
+            accepted_left.append(left_chunk[keep])
+            accepted_right.append(right_chunk[keep])
+            accepted_scores.append(scores[keep])
+    
+    # Isti par je lahko najden v več pasovih
+    empty = np.empty(0, dtype=np.int64)
+    accepted = pd.DataFrame({
+        'left': np.concatenate(accepted_left or [empty]),
+        'right': np.concatenate(accepted_right or [empty]),
+        'score': np.concatenate(accepted_scores or [np.empty(0)]),
+    }).drop_duplicates(['left', 'right'])
+    results = [(left_products[left_i], right_products[right_i], float(score))
+               for left_i, right_i, score in accepted.itertuples(index=False)
+               if not _flavors_conflict(left_products[left_i], right_products[right_i])]
+    
+    results.sort(key=lambda result: (-result[2], result[0].name, result[1].name))
+    return results
@@ -0,0 +1,295 @@
+"""Append-only price history per (match_key, source) with point and range queries"""
+import argparse
+import datetime
+import os
+
+import numpy as np
+import pandas as pd
+
+# Mapa z zgodovino cen: series.tsv (ključi serij) in en stisnjen segment na dan
+HISTORY_DIR = '.price_history'
+
+# Cena v centih; MISSING pomeni, da izdelka tisti dan ni bilo v trgovini
+MISSING = -1
+
+HISTORY_COLUMNS = ['match_key', 'source', 'price', 'since']
+
+def _day(value):
+    """date, datetime or 'YYYY-MM-DD' -> proleptic ordinal (int)"""
+    if isinstance(value, str):
+        value = datetime.date.fromisoformat(value)
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    return value.toordinal()
+
+def _date(ordinal):
+    return datetime.date.fromordinal(int(ordinal))
+
+def _encode(series, days, cents):
+    """Delta-encode (series, day)-sorted columns; runs of equal steps compress to almost nothing"""
+    return {
+        'series': np.diff(series, prepend=0).astype(np.int32),
+        'day': np.diff(days, prepend=0).astype(np.int32),
+        'cents': np.diff(cents, prepend=0).astype(np.int32),
+    }
+
+def _decode(segment):
+    return (np.cumsum(segment['series'], dtype=np.int64),
+            np.cumsum(segment['day'], dtype=np.int64),
+            np.cumsum(segment['cents'], dtype=np.int64))
+
+def daily_prices(frames):
+    """
+    Lowest price in cents per (match_key, source) of {source: product table from ingest_products}
+    Several products with the same key in one store are one series; its price is the cheapest offer.
+    """
+    parts = [frame[['match_key', 'source', 'price']].astype({'match_key': object, 'source': object})
+             for frame in frames.values()]
+    products = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=['match_key', 'source', 'price'])
+    products = products[products['price'].notna() & products['match_key'].notna()]
+    prices = products.groupby(['match_key', 'source'], sort=False)['price'].min()
+    return {key: int(round(price * 100)) for key, price in prices.items()}
+
+class PriceHistory:
+    """
+    Step-function price series, one per (match_key, source)
+    Each append() stores only the series whose price changed since the last snapshot (or that
+    appeared or disappeared), as one delta-encoded, zlib-compressed segment, so years of daily
+    snapshots of a mostly stable catalog stay small. Segments are never rewritten; a query
+    loads all of them once into (series, day)-sorted NumPy columns.
+    """
+    def __init__(self, path=HISTORY_DIR):
+        self.path = path
+        self._columns = None
+        self._keys = None
+
+    @property
+    def _series_path(self):
+        return os.path.join(self.path, 'series.tsv')
+
+    def _segment_paths(self):
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(os.path.join(self.path, name) for name in os.listdir(self.path) if name.endswith('.npz'))
+
+    @property
+    def days(self):
+        """Dates of all appended snapshots"""
+        return [datetime.date.fromisoformat(os.path.basename(path)[:-4]) for path in self._segment_paths()]
+
+    def _load(self):
+        if self._columns is not None:
+            return
+        self._keys = []
+        if os.path.exists(self._series_path):
+            with open(self._series_path, encoding='utf-8') as f:
+                self._keys = [tuple(line.rstrip('\n').split('\t')) for line in f if line.strip()]
+
+        parts = []
+        for path in self._segment_paths():
+            with np.load(path) as segment:
+                parts.append(_decode(segment))
+        if parts:
+            series, days, cents = (np.concatenate(column) for column in zip(*parts))
+        else:
+            series = days = cents = np.empty(0, dtype=np.int64)
+        order = np.lexsort((days, series))
+        self._columns = series[order], days[order], cents[order]
+
+    def _key_codes(self):
+        return {key: code for code, key in enumerate(self._keys)}
+
+    def _latest(self, day):
+        """(series, since, cents) of the observation in effect on a day, one per series"""
+        self._load()
+        series, days, cents = self._columns
+        rows = np.flatnonzero(days <= day)
+        # Vrstice so urejene po (serija, dan): zadnja vrstica vsake serije je veljavna cena
+        last = rows[np.append(series[rows][1:] != series[rows][:-1], True)] if len(rows) else rows
+        return series[last], days[last], cents[last]
+
+    def append(self, day, frames):
+        """
+        Add the snapshot of one day ({source: product table from ingest_products})
+        Snapshots must be appended in date order; series missing from the snapshot are closed.
+        """
+        day = _day(day)
+        existing = self.days
+        if existing and day <= existing[-1].toordinal():
+            raise ValueError(f"History already has {existing[-1]}; snapshots are append-only and must be newer")
+
+        self._load()
+        codes = self._key_codes()
+        prices = daily_prices(frames)
+        new_keys = [key for key in prices if key not in codes]
+
+        # Novi ključi se dodajo na konec, koda serije je številka vrstice
+        os.makedirs(self.path, exist_ok=True)
+        if new_keys:
+            with open(self._series_path, 'a', encoding='utf-8') as f:
+                f.writelines(f"{match_key}\t{source}\n" for match_key, source in new_keys)
+            for key in new_keys:
+                codes[key] = len(self._keys)
+                self._keys.append(key)
+
+        current = np.full(len(self._keys), MISSING, dtype=np.int64)
+        current[[codes[key] for key in prices]] = list(prices.values())
+        previous = np.full(len(self._keys), MISSING, dtype=np.int64)
+        last_series, _, last_cents = self._latest(day)
+        previous[last_series] = last_cents
+
+        changed = np.flatnonzero(current != previous)
+        segment = _encode(changed, np.full(len(changed), day), current[changed])
+        path = os.path.join(self.path, f"{_date(day).isoformat()}.npz")
+        with open(f"{path}.tmp", 'wb') as f:
+            np.savez_compressed(f, **segment)
+        os.replace(f"{path}.tmp", path)
+        
+        series, days, cents = (np.concatenate([column, new]) for column, new in zip(self._columns, _decode(segment)))
+        order = np.lexsort((days, series))
+        self._columns = series[order], days[order], cents[order]
+        return len(changed)
+
+    def _frame(self, series, columns):
+        keys = [self._keys[code] for code in series]
+        frame = pd.DataFrame({
+            'match_key': [key[0] for key in keys],
+            'source': [key[1] for key in keys],
+            **columns,
+        })
+        return frame.sort_values(['match_key', 'source'], ignore_index=True)
+
+    def _select(self, series, match_key, source):
+        """Mask of series of one match_key and/or source"""
+        keep = np.ones(len(series), dtype=bool)
+        if match_key is not None:
+            keep &= np.array([self._keys[code][0] == match_key for code in series], dtype=bool)
+        if source is not None:
+            keep &= np.array([self._keys[code][1] == source for code in series], dtype=bool)
+        return keep
+
+    def price_at(self, day, match_key=None, source=None):
+        """Prices in effect on a day (match_key, source, price, since)"""
+        series, since, cents = self._latest(_day(day))
+        keep = (cents != MISSING) & self._select(series, match_key, source)
+        return self._frame(series[keep], {
+            'price': cents[keep] / 100,
+            'since': [_date(value) for value in since[keep]],
+        })
+
+    def window(self, start, end, match_key=None, source=None):
+        """Lowest and highest price of every series between two dates, inclusive"""
+        start, end = _day(start), _day(end)
+        first_series, _, first_cents = self._latest(start)
+        series, days, cents = self._columns
+        inside = (days > start) & (days <= end)
+
+        # Cena, veljavna na začetku okna, in vse spremembe znotraj njega
+        series = np.concatenate([first_series, series[inside]])
+        cents = np.concatenate([first_cents, cents[inside]])
+        keep = (cents != MISSING) & self._select(series, match_key, source)
+        prices = pd.DataFrame({'series': series[keep], 'price': cents[keep] / 100})
+        grouped = prices.groupby('series', sort=True)['price'].agg(['min', 'max', 'count'])
+        return self._frame(grouped.index.to_numpy(), {
+            'min': grouped['min'].to_numpy(),
+            'max': grouped['max'].to_numpy(),
+            'changes': grouped['count'].to_numpy() - 1,
+        })
+
+    def movers(self, days, k=10, end=None, source=None):
+        """Series with the largest relative price change over the last `days` days (to the last snapshot)"""
+        if end is None:
+            snapshots = self.days
+            if not snapshots:
+                return pd.DataFrame(columns=['match_key', 'source', 'old_price', 'price', 'change', 'change_percent'])
+            end = snapshots[-1]
+        end = _day(end)
+        old_series, _, old_cents = self._latest(end - days)
+        new_series, _, new_cents = self._latest(end)
+
+        old = np.full(len(self._keys), MISSING, dtype=np.int64)
+        old[old_series] = old_cents
+        old = old[new_series]
+        keep = (old != MISSING) & (new_cents != MISSING) & (old != new_cents) & self._select(new_series, None, source)
+
+        change = (new_cents[keep] - old[keep]) / 100
+        movers = pd.DataFrame({
+            'series': new_series[keep],
+            'old_price': old[keep] / 100,
+            'price': new_cents[keep] / 100,
+            'change': change,
+            'change_percent': change / (old[keep] / 100) * 100,
+        })
+        movers = movers.reindex(movers['change_percent'].abs().sort_values(ascending=False, kind='stable').index)
+        movers = movers.head(k)
+        keys = [self._keys[code] for code in movers['series']]
+        movers.insert(0, 'match_key', [key[0] for key in keys])
+        movers.insert(1, 'source', [key[1] for key in keys])
+        return movers.drop(columns='series').reset_index(drop=True)
+
+    def nbytes(self):
+        """Size of the store on disk"""
+        paths = self._segment_paths() + ([self._series_path] if os.path.exists(self._series_path) else [])
+        return sum(os.path.getsize(path) for path in paths)
+
+def main(argv=None):
+    """Command line entry point: python -m primerjava.history"""
+    from .service import load_frames
+    from .sources import SOURCES, SourceConfig
+
+    parser = argparse.ArgumentParser(prog='primerjava.history', description='Zgodovina cen po ključih in trgovinah.')
+    parser.add_argument('--history', metavar='DIR', default=HISTORY_DIR, help='mapa z zgodovino cen')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    append = commands.add_parser('append', help='dodaj današnje cene trgovin')
+    append.add_argument('--date', default=None, help='datum posnetka (YYYY-MM-DD), privzeto danes')
+    append.add_argument('--source', nargs=4, action='append',
+                        metavar=('NAME', 'PATH', 'NAME_COLUMN', 'PRICE_COLUMN'),
+                        help='trgovina (lahko večkrat); privzeto Spar in Mercator')
+    append.add_argument('--workers', type=int, default=1, help='število procesov za razčlenjevanje imen')
+
+    at = commands.add_parser('at', help='cene na dan')
+    at.add_argument('date')
+    at.add_argument('--key', default=None)
+    at.add_argument('--store', default=None)
+
+    window = commands.add_parser('range', help='najnižja in najvišja cena v obdobju')
+    window.add_argument('start')
+    window.add_argument('end')
+    window.add_argument('--key', default=None)
+    window.add_argument('--store', default=None)
+
+    movers = commands.add_parser('movers', help='največje spremembe cen v zadnjih N dneh')
+    movers.add_argument('--days', type=int, default=30)
+    movers.add_argument('-k', type=int, default=10)
+    movers.add_argument('--store', default=None)
+    args = parser.parse_args(argv)
+
+    history = PriceHistory(args.history)
+    if args.command == 'append':
+        sources = [SourceConfig(*values) for values in args.source] if args.source else SOURCES
+        try:
+            frames = load_frames(sources, workers=args.workers)
+        except FileNotFoundError as e:
+            print(f"Napaka pri branju datotek: {e}")
+            return 1
+        day = args.date or datetime.date.today()
+        try:
+            changed = history.append(day, frames)
+        except ValueError as e:
+            print(e)
+            return 1
+        print(f"Dodan posnetek {day}: {changed} sprememb, velikost zgodovine {history.nbytes() / 1024:.1f} KB")
+        return 0
+
+    if args.command == 'at':
+        result = history.price_at(args.date, args.key, args.store)
+    elif args.command == 'range':
+        result = history.window(args.start, args.end, args.key, args.store)
+    else:
+        result = history.movers(args.days, args.k, source=args.store)
+    print(result.to_string(index=False) if len(result) else "Ni podatkov.")
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
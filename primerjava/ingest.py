@@ -0,0 +1,229 @@
+"""Vectorized (pandas) ingestion of store tables"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .keywords import AUTOMATON_KEYWORDS, _brand_from_hits, _flavor_from_hits, scan_keywords
+from .metrics import METRICS
+from .normalize import standardize_name
+from .parsing import (MAX_VOLUME_ML, PACKAGE_VOLUME_RE, SINGLE_VOLUME_RE, UNIT_TO_ML, ParsedProduct, Product,
+                      build_flavor_key)
+
+# Vzporedno razčlenjevanje: število procesov (None = vsa jedra) in velikost kosa imen
+PARSE_WORKERS = None
+PARSE_CHUNK_SIZE = 20000
+
+# Stolpci in tipi tabele izdelkov, ki jo vrne ingest_products
+PRODUCT_COLUMNS = {
+    'original_name': 'string',
+    'name': 'string',
+    'price': 'float64',
+    'brand': 'category',
+    'flavor': 'object',
+    'volume_str': 'category',
+    'volume_ml': 'Int64',
+    'is_package': 'bool',
+    'package_count': 'Int64',
+    'single_unit_ml': 'Int64',
+    'match_key': 'string',
+    'source': 'category',
+}
+
+METRICS.declare('keyword_hits', AUTOMATON_KEYWORDS)
+METRICS.declare('fallback_rows', ['NOBRAND', 'NOFLAVOR', 'NOVOLUME'])
+_KEYWORD_HITS = METRICS.counter('keyword_hits')
+
+def clean_prices(prices):
+    """Vectorized clean_price for a whole column; unparsable prices become NaN"""
+    price_str = prices.astype(str).str.replace(r'[^\d,\.]', '', regex=True)
+    
+    # "1.234,56" -> "1234.56", "1,97" -> "1.97"
+    both = price_str.str.contains(',', regex=False) & price_str.str.contains('.', regex=False)
+    price_str = price_str.mask(both, price_str.str.replace('.', '', regex=False))
+    price_str = price_str.str.replace(',', '.', regex=False)
+    
+    cleaned = pd.to_numeric(price_str, errors='coerce')
+    return cleaned.mask(prices.isna()).astype('float64')
+
+def extract_volumes(names):
+    """
+    Vectorized extract_and_standardize_volume for a column of standardized names
+    Returns a DataFrame with volume_str, volume_ml, is_package, package_count, single_unit_ml
+    """
+    names = names.astype(str).str.upper()
+    package = names.str.extract(PACKAGE_VOLUME_RE)
+    single = names.str.extract(SINGLE_VOLUME_RE)
+    is_package = package[0].notna()
+    
+    # Paket ima prednost pred posameznim volumnom
+    volume_num = package[1].where(is_package, single[0]).astype('float64')
+    unit = package[2].where(is_package, single[1])
+    
+    # Round to avoid floating point errors
+    unit_ml = (volume_num * unit.map(UNIT_TO_ML).astype('float64')).round()
+    package_count = pd.to_numeric(package[0], errors='coerce').astype('float64').where(is_package, 1.0)
+    # Prevelik volumen pomeni, da volumna ni (kot extract_and_standardize_volume)
+    valid = (package_count < MAX_VOLUME_ML) & (unit_ml * package_count <= MAX_VOLUME_ML)
+    is_package &= valid
+    unit_ml = unit_ml.where(valid).astype('Int64')
+    package_count = package_count.where(valid).astype('Int64')
+    total_ml = unit_ml * package_count
+    
+    unit_ml_str = unit_ml.astype('string')
+    volume_str = ('PACK_' + package_count.astype('string') + 'X' + unit_ml_str + 'ML').where(
+        is_package, 'SINGLE_' + unit_ml_str + 'ML')
+    
+    return pd.DataFrame({
+        'volume_str': volume_str.astype(object).where(unit_ml.notna(), None),
+        'volume_ml': total_ml,
+        'is_package': is_package,
+        'package_count': package_count,
+        'single_unit_ml': unit_ml,
+    }, index=names.index)
+
+def parse_names(raw_names):
+    """
+    Standardize and parse a sequence of raw names
+    Returns a DataFrame with one row per raw name: the standardized name and the ParsedProduct fields.
+    Each distinct standardized name is parsed only once.
+    """
+    with METRICS.stage('parse.standardize', len(raw_names)):
+        standardized = pd.Series([standardize_name(raw) for raw in raw_names], dtype=object)
+    
+    # Znamko, okus in volumen izluščimo samo enkrat za vsako različno ime
+    name_codes, name_uniques = pd.factorize(standardized)
+    unique_names = pd.Series(name_uniques, dtype=object)
+    brands = []
+    flavors = []
+    flavor_keys = []
+    with METRICS.stage('parse.keywords', len(unique_names)):
+        for name in unique_names:
+            name_upper = name.upper()
+            hits, word_hits = scan_keywords(name_upper)
+            _KEYWORD_HITS.update(word_hits)
+            brand = _brand_from_hits(hits)
+            flavor = _flavor_from_hits(name_upper, hits, word_hits)
+            brands.append(brand)
+            flavors.append(flavor)
+            flavor_keys.append(build_flavor_key(brand, flavor))
+    
+    with METRICS.stage('parse.volume', len(unique_names)):
+        volumes = extract_volumes(unique_names)
+    unique_brands = pd.Series(brands, dtype=object)
+    match_keys = (unique_brands + '_' + pd.Series(flavor_keys, dtype=object) + '_' +
+                  volumes['volume_str'].fillna('NOVOLUME'))
+    
+    return pd.DataFrame({
+        'name': standardized.to_numpy(),
+        'brand': unique_brands.to_numpy()[name_codes],
+        'flavor': pd.Series(flavors, dtype=object).to_numpy()[name_codes],
+        'volume_str': volumes['volume_str'].to_numpy()[name_codes],
+        'volume_ml': volumes['volume_ml'].take(name_codes).to_numpy(),
+        'is_package': volumes['is_package'].to_numpy()[name_codes],
+        'package_count': volumes['package_count'].take(name_codes).to_numpy(),
+        'single_unit_ml': volumes['single_unit_ml'].take(name_codes).to_numpy(),
+        'match_key': match_keys.to_numpy()[name_codes],
+    })
+
+def parse_names_parallel(raw_names, workers=1, chunk_size=PARSE_CHUNK_SIZE):
+    """
+    parse_names split into chunks over a process pool
+    Chunks are returned in input order, so the result is identical to parse_names(raw_names).
+    workers=None uses all CPU cores; small inputs are parsed serially.
+    """
+    raw_names = list(raw_names)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(raw_names) <= chunk_size:
+        return parse_names(raw_names)
+    
+    chunks = [raw_names[start:start + chunk_size] for start in range(0, len(raw_names), chunk_size)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+        parts = list(executor.map(_parse_names_with_metrics, chunks))
+    
+    # Meritve iz delovnih procesov prištejemo k meritvam glavnega procesa
+    for _, snapshot in parts:
+        METRICS.merge(snapshot)
+    return pd.concat([frame for frame, _ in parts], ignore_index=True)
+
+def _parse_names_with_metrics(raw_names):
+    """parse_names in a worker process, returning the frame and the metrics it collected"""
+    METRICS.reset()
+    frame = parse_names(raw_names)
+    return frame, METRICS.snapshot()
+
+def ingest_products(df, name_column, price_column, source, cache=None, workers=1, chunk_size=PARSE_CHUNK_SIZE):
+    """
+    Batch ingestion of one store's DataFrame into a typed product table
+    Names are standardized and parsed only once per unique value and mapped back to rows.
+    With a ParseCache, names parsed in earlier runs are loaded instead of parsed again.
+    workers > 1 parses new names in parallel (see parse_names_parallel).
+    """
+    if name_column not in df.columns or price_column not in df.columns:
+        return pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in PRODUCT_COLUMNS.items()})
+    
+    with METRICS.stage('ingest', len(df)):
+        products = _ingest_rows(df[name_column], df[price_column], source, cache, workers, chunk_size)
+    count_outcomes(products)
+    return products
+
+def _ingest_rows(raw_names, raw_prices, source, cache, workers, chunk_size):
+    """Body of ingest_products for a present name and price column"""
+    prices = clean_prices(raw_prices)
+    
+    # Obdelamo samo različna surova imena (NaN dobi kodo -1)
+    raw_codes, raw_uniques = pd.factorize(raw_names)
+    if cache is not None:
+        parsed = cache.parse_names(raw_uniques, workers, chunk_size)
+    else:
+        parsed = parse_names_parallel(raw_uniques, workers, chunk_size)
+    names = parsed['name'].to_numpy(dtype=object)
+    
+    keep = (raw_codes >= 0) & prices.notna().to_numpy()
+    keep[keep] = names[raw_codes[keep]] != ''
+    rows = raw_codes[keep]
+    
+    products = pd.DataFrame({
+        'original_name': raw_names[keep].astype(str).to_numpy(),
+        'name': names[rows],
+        'price': prices[keep].to_numpy(),
+        **{field: parsed[field].take(rows).to_numpy() for field in ParsedProduct.__slots__},
+        'source': source,
+    })
+    
+    return products.astype(PRODUCT_COLUMNS)
+
+def count_outcomes(products):
+    """Add brand, flavor and NOBRAND/NOFLAVOR/NOVOLUME row counts of a product table to METRICS"""
+    brands = products['brand'].value_counts(sort=False)
+    METRICS.counter('brand_rows').update({brand: int(count) for brand, count in brands.items() if count})
+    flavors = products['flavor'].explode().dropna().value_counts(sort=False)
+    METRICS.counter('flavor_rows').update({flavor: int(count) for flavor, count in flavors.items()})
+    
+    METRICS.counter('fallback_rows').update({
+        'NOBRAND': int((products['brand'] == 'NOBRAND').sum()),
+        'NOFLAVOR': int((products['flavor'].map(len) == 0).sum()),
+        'NOVOLUME': int(products['volume_str'].isna().sum()),
+    })
+
+def products_from_frame(products):
+    """Convert a product table from ingest_products to a list of Product records"""
+    # Enaka imena si delijo isti ParsedProduct
+    parsed_by_name = {}
+    result = []
+    for row in products.itertuples(index=False):
+        parsed = parsed_by_name.get(row.name)
+        if parsed is None:
+            parsed = ParsedProduct(
+                row.brand, row.flavor, None if pd.isna(row.volume_str) else row.volume_str,
+                None if pd.isna(row.volume_ml) else int(row.volume_ml),
+                bool(row.is_package),
+                None if pd.isna(row.package_count) else int(row.package_count),
+                None if pd.isna(row.single_unit_ml) else int(row.single_unit_ml),
+                row.match_key,
+            )
+            parsed_by_name[row.name] = parsed
+        result.append(Product(row.original_name, row.name, float(row.price), row.source, parsed))
+    
+    return result
@@ -0,0 +1,296 @@
+"""Brand and flavor keyword tables and their one-pass detection"""
+import re
+
+# Splošni seznam okusov - zdaj standardiziramo vse pomarančne variacije
+FLAVOR_KEYWORDS = [
+    'CITRUS', 'LIMONA', 'POMARANČA', 'POMARANCA', 'ORANGE',
+    'BOROVNICA', 'BLUEBERRY', 'BRUSNICA',
+    'JAGODA', 'STRAWBERRY',
+    'MALINA', 'RASPBERRY',
+    'LUBENICA', 'WATERMELON',
+    'ANANAS', 'PINEAPPLE',
+    'MANGO',
+    'MENTOL', 'META', 'MINT',
+    'GRENIVKA', 'GRAPEFRUIT',
+    'VANILIJA', 'VANILLA',
+    'KOKOS', 'COCONUT',
+    'MEŠANO SADJE', 'MULTIFRUIT', 'FRUITY', 'TUTTI FRUTTI',
+    'SADNI', 'FRUIT', 'MIXED FRUIT',
+    'TROPSKO SADJE', 'TROPICAL',
+    'CLASSIC', 'ORIGINAL',
+    'ZERO', 'SUGAR FREE', 'SUGARFREE', 'BREZ SLADKORJA',
+    'SUMMER EDITION', 'WINTER', 'WINTER EDITION',
+    'ULTRA', 'PIPELINE PUNCH', 'RIO PUNCH',
+    'GREEN APPLE', 'ZELENO JABOLKO',
+    'BLACK CHERRY', 'ČRNA ČEŠNJA',
+    'GOJI BERRY',
+    'STRONG FOCUS', 'STIMULATION',
+    'MOUNTAIN BLAST',
+    'JABOLKO', 'APPLE',
+    'LIMETA', 'LIME',
+    'HROŠKA', 'PEAR',
+    'MARELICA', 'APRICOT',
+    'BEZEG', 'ELDERBERRY',
+    'INGVER', 'GINGER',
+    'KIWI',
+    'BANANA',
+    'PASSIONFRUIT', 'PASIJONKA',
+    'COLA',
+    'TEA', 'ČAJ',
+    'MATCHA',
+    'BRESKEV', 'PEACH',
+    'YUZU',
+    'YERBA MATE', 'MATE',
+    'ICE TEA', 'LEDENI ČAJ', 'LEMON', 'PEPSI', 'COCA COLA', 'COCA-COLA',
+    'COLA ZERO', 'COCA COLA ZERO', 'SPRITE', 'FANTA', 'FANTA ORANGE',
+    'MIRINDA', '7UP', 'SCHWEPPES', 'TANGERINA', 'TANGERINE', 'MANDARINA',
+    'MULTIVITAMIN', 'VITAMIN',
+    # Dodani za izdelke Caribbean
+    'ISLAND', 'ISLAND PUNCH', 'PUNCH',
+    'GUAVA', 'PASSION', 'MARACUJA'
+]
+
+# Standardiziramo vse pomarančne okuse na POMARANCA
+# To vključuje: ORANGE, POMARANČA, POMARANCA, BLOOD ORANGE, RED ORANGE, RDEČA POMARANČA
+POMARANCA_VARIANTS = ['ORANGE', 'POMARANČA', 'POMARANCA']
+
+# Posebni okusi za Oshee - (ključne besede, standardiziran okus), vrstni red je pomemben
+OSHEE_FLAVORS = [
+    (['SADNI', 'SADNI MIX', 'FRUIT MIX'], 'SADNI_MIX'),
+    # BLOOD ORANGE je isto kot POMARANCA/RDEČA POMARANČA
+    (['POMARANČNI', 'POMARANCA', 'ORANGE'], 'POMARANCA'),
+    (['LIMONA', 'LEMON'], 'LIMONA'),
+    (['BRESKEV', 'PEACH'], 'BRESKEV'),
+    (['MULTIVITAMIN'], 'MULTIVITAMIN'),
+    (['BOROVNICA', 'BLUEBERRY'], 'BOROVNICA'),
+]
+
+BLOOD_ORANGE_KEYWORDS = ['BLOOD ORANGE', 'BLOODORANGE', 'RED ORANGE', 'RDEČA POMARANČA']
+
+# Znamke, ki jih v imenu ne štejemo za okus
+KNOWN_BRANDS = [
+    'RED BULL', 'MONSTER', 'HELL', 'SHARK', 'POWERADE', 'OSHEE', 'ISOSTAR',
+    'S BUDGET', 'S-BUDGET', 'CLUB MATE', 'CLUB-MATE', 'PERFECT TED', 
+    'FRUCTAL', 'NUTREND', 'NOCCO', '4MOVE', 'DANA', 'GATORADE', 'RAUCH',
+    'BURN', 'BOOSTER', 'MTV UP', 'OK', 'SQUID GAME', 'VITAMIN WELL',
+    'FUNCTIONALL', 'ZALA', 'BRITE', 'HIDRA UP', 'PRIME HYDRATION',
+    'LOHILO', 'VITALITY', 'ACTIVEFIT', 'SPAR', 'SOLA', 'ROSSI',
+    'PEPSI', 'COCA', 'COLA', 'SPRITE', 'FANTA', 'MIRINDA', 'SCHWEPPES',
+    'CARIBBEAN'  # Caribbean je okus, ne znamka
+]
+
+# Tehnične besede, ki niso okusi
+TECHNICAL_TERMS = ['ML', 'L', 'CL', 'DL', 'X', 'PACK', 'CAN', 'BOTTLE', 
+                   'PET', 'GLASS', 'ENERGY', 'DRINK', 'WATER', 'JUICE',
+                   'LIMITED', 'EDITION', 'SUGAR', 'FREE', 'ZERO', 'LIGHT',
+                   'SPORT', 'ISOTONIC', 'REFRESHING', 'COOL', 'FRESH',
+                   'BLOOD', 'RED']  # Dodali BLOOD in RED, ker nista okus
+
+# Znamke, ki jih iščemo, če je v imenu CARIBBEAN (vrstni red je prioriteta)
+CARIBBEAN_OTHER_BRANDS = [
+    'RED BULL', 'MONSTER', 'HELL', 'SHARK', 'POWERADE', 'ISOSTAR',
+    'S BUDGET', 'S-BUDGET', 'CLUB MATE', 'CLUB-MATE', 'PERFECT TED', 
+    'FRUCTAL', 'NUTREND', 'NOCCO', '4MOVE', 'DANA', 'GATORADE', 'RAUCH',
+    'BURN', 'BOOSTER', 'MTV UP', 'OK', 'SQUID GAME', 'VITAMIN WELL',
+    'FUNCTIONALL', 'ZALA', 'BRITE', 'HIDRA UP', 'PRIME HYDRATION',
+    'LOHILO', 'VITALITY', 'ACTIVEFIT', 'SPAR', 'SOLA', 'ROSSI',
+    'PEPSI', 'COCA COLA', 'COCA-COLA', 'COCA', 'SPRITE', 'FANTA', 'MIRINDA',
+    'SCHWEPPES'
+]
+
+BRANDS = [
+    'RED BULL', 'MONSTER', 'HELL', 'SHARK', 'POWERADE', 'ISOSTAR',
+    'S BUDGET', 'S-BUDGET', 'CLUB MATE', 'CLUB-MATE', 'PERFECT TED', 
+    'FRUCTAL', 'NUTREND', 'NOCCO', '4MOVE', 'DANA', 'GATORADE', 'RAUCH',
+    'BURN', 'BOOSTER', 'MTV UP', 'OK', 'SQUID GAME', 'VITAMIN WELL',
+    'FUNCTIONALL', 'ZALA', 'BRITE', 'HIDRA UP', 'PRIME HYDRATION',
+    'LOHILO', 'VITALITY', 'ACTIVEFIT', 'SPAR', 'SOLA', 'ROSSI',
+    'PEPSI', 'COCA COLA', 'COCA-COLA', 'COCA', 'SPRITE', 'FANTA', 'MIRINDA',
+    'SCHWEPPES', 'TANGERINA', 'TANGERINE', 'MANDARINA'
+]
+
+# Posebna imena znamk z vezajem
+BRAND_ALIASES = {
+    'S-BUDGET': 'S_BUDGET',
+    'CLUB-MATE': 'CLUB_MATE',
+    'COCA-COLA': 'COCA_COLA',
+}
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton that finds every keyword occurrence in one pass
+    Keywords are matched as plain substrings; word boundaries are checked on the hits.
+    """
+    def __init__(self, keywords):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        
+        for keyword in dict.fromkeys(keywords):
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            self._output[state] = self._output[state] + (keyword,)
+        
+        # Povezave ob neuspehu gradimo v širino (BFS)
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fail
+                self._output[next_state] = self._output[next_state] + self._output[fail]
+    
+    def scan(self, text):
+        """
+        Return (hits, word_hits): all keywords found as substrings and
+        the subset found with word boundaries on both sides
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        hits = set()
+        word_hits = set()
+        text_len = len(text)
+        state = 0
+        
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            
+            for keyword in output[state]:
+                hits.add(keyword)
+                start = end - len(keyword)
+                if ((start == 0 or not _is_word_char(text[start - 1])) and
+                        (end == text_len or not _is_word_char(text[end]))):
+                    word_hits.add(keyword)
+        
+        return hits, word_hits
+
+def _is_word_char(char):
+    """Same definition of a word character as \\w in re"""
+    return char.isalnum() or char == '_'
+
+def _all_substrings(words):
+    """Every substring of every word (for the 'word in brand' check)"""
+    substrings = set()
+    for word in words:
+        for start in range(len(word)):
+            for end in range(start + 1, len(word) + 1):
+                substrings.add(word[start:end])
+    return substrings
+
+# Avtomat zgradimo samo enkrat ob nalaganju - vsebuje vse znamke, okuse in posebne primere
+AUTOMATON_KEYWORDS = list(dict.fromkeys(
+    FLAVOR_KEYWORDS + BRANDS + CARIBBEAN_OTHER_BRANDS + KNOWN_BRANDS + BLOOD_ORANGE_KEYWORDS +
+    [keyword for keywords, _ in OSHEE_FLAVORS for keyword in keywords] +
+    ['OSHEE', 'CARIBBEAN', 'BLOOD', 'ORANGE']
+))
+KEYWORD_AUTOMATON = KeywordAutomaton(AUTOMATON_KEYWORDS)
+
+# Večbesedni okusi se iščejo kot podniz, enobesedni z mejami besed
+_MULTIWORD_FLAVORS = [flavor for flavor in FLAVOR_KEYWORDS if ' ' in flavor]
+_SINGLE_WORD_FLAVORS = [flavor for flavor in FLAVOR_KEYWORDS if ' ' not in flavor]
+
+# Daljša imena znamk imajo prednost (stabilno razvrščanje ohrani vrstni red pri enaki dolžini)
+_BRANDS_BY_LENGTH = sorted(BRANDS, key=lambda x: len(x), reverse=True)
+_KNOWN_BRAND_SUBSTRINGS = _all_substrings(KNOWN_BRANDS)
+_FALLBACK_WORD_RE = re.compile(r'\b[A-Z][A-Z]+\b')
+
+def scan_keywords(name_upper):
+    """Find all brand and flavor keywords in an uppercased name in one pass"""
+    return KEYWORD_AUTOMATON.scan(name_upper)
+
+def _normalize_brand(brand):
+    """Convert a matched brand keyword to its key form"""
+    return BRAND_ALIASES.get(brand, brand.replace(' ', '_'))
+
+def _flavor_from_hits(name_upper, hits, word_hits):
+    """Extract flavor tuple from the keyword hits of a name"""
+    # POSEBNI PRIMERI ZA OSHEE - moramo natančno razlikovati
+    # Oshee sadni mix in pomarančni nista isti okus!
+    if 'OSHEE' in hits:
+        for keywords, oshee_flavor in OSHEE_FLAVORS:
+            if any(keyword in hits for keyword in keywords):
+                return (oshee_flavor,)
+    
+    # POSEBNI PRIMER ZA CARIBBEAN - to je specifičen okus/izdelek
+    if 'CARIBBEAN' in hits:
+        return ('CARIBBEAN',)
+    
+    # Poseben primer: BLOOD ORANGE je isto kot RDEČA POMARANČA/POMARANCA
+    if any(keyword in hits for keyword in BLOOD_ORANGE_KEYWORDS):
+        return ('POMARANCA',)
+    
+    # Poiščemo vse okuse, ki so v imenu
+    flavors = [flavor.replace(' ', '_') for flavor in _MULTIWORD_FLAVORS if flavor in hits]
+    flavors += [flavor for flavor in _SINGLE_WORD_FLAVORS if flavor in word_hits]
+    
+    if any(variant in flavors for variant in POMARANCA_VARIANTS) or 'BLOOD' in hits and 'ORANGE' in hits:
+        # Odstranimo vse pomarančne variante
+        flavors = [f for f in flavors if f not in POMARANCA_VARIANTS]
+        # Dodamo standardiziran okus
+        if 'POMARANCA' not in flavors:
+            flavors.append('POMARANCA')
+    
+    # Uredi in odstrani duplikate
+    flavors = sorted(set(flavors))
+    
+    # Če imamo Oshee izdelek brez okusa, dodamo "CLASSIC"
+    if 'OSHEE' in hits and not flavors:
+        flavors.append('CLASSIC')
+    
+    # Če ni najden noben okus, poskusimo izluščiti iz imena
+    # Če je katerakoli znamka v imenu, so vse besede označene kot znamka
+    if not flavors and not any(brand in hits for brand in KNOWN_BRANDS):
+        filtered_words = [
+            word for word in _FALLBACK_WORD_RE.findall(name_upper)
+            if word not in _KNOWN_BRAND_SUBSTRINGS and word not in TECHNICAL_TERMS and len(word) > 2
+        ]
+        flavors = filtered_words[:3]  # Vzamemo največ 3 besede
+    
+    return tuple(flavors)
+
+def _brand_from_hits(hits):
+    """Extract brand from the keyword hits of a name"""
+    # Oshee mora biti vedno prepoznan kot znamka
+    if 'OSHEE' in hits:
+        return 'OSHEE'
+    
+    # Caribbean NI znamka, ampak okus/izdelek - ne vračamo Caribbean kot znamko
+    # če je Caribbean v imenu, iščemo drugo znamko
+    if 'CARIBBEAN' in hits:
+        for brand in CARIBBEAN_OTHER_BRANDS:
+            if brand in hits:
+                return _normalize_brand(brand)
+        # Če ni druge znamke, Caribbean je verjetno okus neke druge znamke
+        return 'NOBRAND'
+    
+    # Najprej preverimo dolge imena znamk
+    for brand in _BRANDS_BY_LENGTH:
+        if brand in hits:
+            return _normalize_brand(brand)
+    
+    return 'NOBRAND'
+
+def extract_flavor(name):
+    """Extract exact flavor from name without modification"""
+    name_upper = name.upper()
+    hits, word_hits = scan_keywords(name_upper)
+    return _flavor_from_hits(name_upper, hits, word_hits)
+
+def extract_brand(name):
+    """Extract brand from name"""
+    hits, _ = scan_keywords(name.upper())
+    return _brand_from_hits(hits)
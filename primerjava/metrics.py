@@ -0,0 +1,134 @@
+"""Lightweight run instrumentation: stage timers, row counters and rule hit counts"""
+import json
+import math
+import numbers
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+# Opisi števcev za Prometheus (ime -> (ime oznake, opis))
+COUNTER_HELP = {
+    'unwanted_pattern_hits': ('pattern', 'Distinct raw names changed by each unwanted_patterns regex'),
+    'keyword_hits': ('keyword', 'Parsed names containing each keyword as a whole word'),
+    'brand_rows': ('brand', 'Product rows per extracted brand'),
+    'flavor_rows': ('flavor', 'Product rows per extracted flavor'),
+    'fallback_rows': ('fallback', 'Product rows falling back to NOBRAND, NOFLAVOR or NOVOLUME'),
+}
+METRICS_PREFIX = 'primerjava'
+
+class Metrics:
+    """
+    Process-wide registry of stage timings and labelled counters
+    Updates are plain dict increments, so it stays enabled in production runs.
+    """
+    def __init__(self):
+        self.stage_seconds = Counter()
+        self.stage_rows = Counter()
+        self.stage_calls = Counter()
+        self.counters = defaultdict(Counter)
+    
+    def reset(self):
+        """Zero all values; counters are reset in place, so references from counter() stay valid"""
+        self.stage_seconds.clear()
+        self.stage_rows.clear()
+        self.stage_calls.clear()
+        for counter in self.counters.values():
+            for label in counter:
+                counter[label] = 0
+    
+    @contextmanager
+    def stage(self, name, rows=0):
+        """Time a block as one run of a stage; more rows can be added later with add_rows"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds[name] += time.perf_counter() - start
+            self.stage_calls[name] += 1
+            self.stage_rows[name] += rows
+    
+    def add_rows(self, stage, rows):
+        """Add processed rows to a stage"""
+        self.stage_rows[stage] += rows
+    
+    def counter(self, name):
+        """Counter of one labelled metric (label -> value), created on first use"""
+        return self.counters[name]
+    
+    def declare(self, name, labels):
+        """Register labels with a zero value, so rules that never fire are exported too"""
+        counter = self.counters[name]
+        for label in labels:
+            counter.setdefault(label, 0)
+    
+    def snapshot(self):
+        """JSON-serializable copy of all values"""
+        return {
+            'stages': {
+                stage: {
+                    'seconds': round(self.stage_seconds[stage], 6),
+                    'calls': self.stage_calls[stage],
+                    'rows': self.stage_rows[stage],
+                }
+                for stage in self.stage_calls
+            },
+            'counters': {name: dict(counter) for name, counter in self.counters.items()},
+        }
+    
+    def merge(self, snapshot):
+        """Add a snapshot (e.g. collected in a worker process) to this registry"""
+        for stage, values in snapshot['stages'].items():
+            self.stage_seconds[stage] += values['seconds']
+            self.stage_calls[stage] += values['calls']
+            self.stage_rows[stage] += values['rows']
+        for name, values in snapshot['counters'].items():
+            self.counters[name].update(values)
+    
+    def to_json(self, indent=2):
+        """All values as a JSON document"""
+        return json.dumps(self.snapshot(), indent=indent, ensure_ascii=False)
+    
+    def to_prometheus(self):
+        """All values in the Prometheus text exposition format"""
+        lines = []
+        stage_metrics = [
+            ('stage_seconds_total', 'Wall time spent in each stage', self.stage_seconds),
+            ('stage_calls_total', 'Number of runs of each stage', self.stage_calls),
+            ('stage_rows_total', 'Rows processed by each stage', self.stage_rows),
+        ]
+        for name, help_text, values in stage_metrics:
+            lines.append(f'# HELP {METRICS_PREFIX}_{name} {help_text}')
+            lines.append(f'# TYPE {METRICS_PREFIX}_{name} counter')
+            for stage in sorted(self.stage_calls):
+                lines.append(f'{METRICS_PREFIX}_{name}{{stage="{_escape_label(stage)}"}} {_format_value(values[stage])}')
+        
+        for name in sorted(self.counters):
+            label, help_text = COUNTER_HELP.get(name, ('label', name))
+            lines.append(f'# HELP {METRICS_PREFIX}_{name}_total {help_text}')
+            lines.append(f'# TYPE {METRICS_PREFIX}_{name}_total counter')
+            for value_label, value in sorted(self.counters[name].items()):
+                lines.append(f'{METRICS_PREFIX}_{name}_total{{{label}="{_escape_label(value_label)}"}} {_format_value(value)}')
+        
+        return '\n'.join(lines) + '\n'
+
+def _format_value(value):
+    """Exact Prometheus sample value: integers as digits, floats with full precision"""
+    if isinstance(value, numbers.Integral):
+        return f"{int(value):d}"
+    value = float(value)
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return 'NaN' if math.isnan(value) else repr(value)
+
+def _escape_label(value):
+    """Escape a Prometheus label value"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def write_metrics(path, metrics=None):
+    """Write metrics to a file: Prometheus text for *.prom / *.txt, JSON otherwise"""
+    metrics = metrics or METRICS
+    text = metrics.to_prometheus() if path.endswith(('.prom', '.txt')) else metrics.to_json()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+METRICS = Metrics()
@@ -0,0 +1,124 @@
+"""Standardization of raw product names and prices"""
+import re
+import sys
+from functools import lru_cache
+
+from .metrics import METRICS
+
+def is_missing(value):
+    """pd.isna for a single value, without importing pandas"""
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return False
+    if isinstance(value, float):
+        return value != value
+    # pd.NA, NaT, ... lahko pridejo samo iz pandas, ki je v tem primeru že naložen
+    pd = sys.modules.get('pandas')
+    return pd is not None and pd.isna(value) is True
+
+# Največje število različnih surovih imen, ki jih hranimo v predpomnilniku
+STANDARDIZE_CACHE_SIZE = 65536
+
+# Vzorci za standardizacijo imen - prevedemo jih samo enkrat ob nalaganju
+# HTML oznake in vse presledke (tudi prelome vrstic) zamenjamo v enem prehodu
+_TAG_OR_SPACE_RE = re.compile(r'(?:<[^>]+>|\s)+')
+_DECIMAL_COMMA_RE = re.compile(r'(\d+)\s*,\s*(\d+)')
+_UNIT_SPACE_RE = re.compile(r'(\d+[\d.]*)\s+(ML|L|CL|DL)\b')
+_PACKAGE_X_RE = re.compile(r'(\d+)\s*X\s+(\d+[\d.]*)')
+
+# Remove unwanted text patterns (vrstni red je pomemben)
+UNWANTED_PATTERNS = [
+    r'V KOŠARICO',
+    r'NAKUP PAKETA.*IZDELKOV',
+    r'PONUDBA VELJA DO:.*',
+    r'PC\d+:\d+,\d+€',
+    r'\d+,\d+\s*€/\s*\d+[A-Z]+',
+    r'\s*-\s*\d+%',
+    r'^\d+\.\s*',
+]
+_UNWANTED_RES = [re.compile(pattern) for pattern in UNWANTED_PATTERNS]
+METRICS.declare('unwanted_pattern_hits', UNWANTED_PATTERNS)
+_UNWANTED_HITS = METRICS.counter('unwanted_pattern_hits')
+
+_SPECIAL_CHARS_RE = re.compile(r'[^\w\s,.X()\-]')
+_WHITESPACE_RE = re.compile(r'\s+')
+_DOT_SPACING_RE = re.compile(r'\s*\.\s*')
+_OPEN_PAREN_SPACING_RE = re.compile(r'\s*\(\s*')
+_CLOSE_PAREN_SPACING_RE = re.compile(r'\s*\)\s*')
+_DASH_SPACING_RE = re.compile(r'\s*-\s*')
+_EDGE_PUNCTUATION_RE = re.compile(r'^[,\s\.]+|[,\s\.]+$')
+
+def _standardize_name_str(name_str):
+    """Standardize an already stringified name (uncached)"""
+    # Convert to uppercase for consistency
+    name_str = name_str.upper()
+    
+    # Remove all HTML tags, line breaks, and extra whitespace
+    name_str = _TAG_OR_SPACE_RE.sub(' ', name_str)
+    name_str = name_str.strip()
+    
+    # CRITICAL FIX: Standardize volume notation FIRST before anything else
+    # Fix "0, 5L" -> "0.5L", "4X 0, 5 L" -> "4X0.5L"
+    # Remove spaces around commas in numbers
+    name_str = _DECIMAL_COMMA_RE.sub(r'\1.\2', name_str)
+    # Remove spaces before units
+    name_str = _UNIT_SPACE_RE.sub(r'\1\2', name_str)
+    # Fix spacing around X in package notation
+    name_str = _PACKAGE_X_RE.sub(r'\1X\2', name_str)
+    
+    for pattern in _UNWANTED_RES:
+        name_str, count = pattern.subn('', name_str)
+        if count:
+            _UNWANTED_HITS[pattern.pattern] += 1
+    
+    # Remove special characters but keep important ones
+    name_str = _SPECIAL_CHARS_RE.sub(' ', name_str)
+    
+    # Fix spacing
+    name_str = _WHITESPACE_RE.sub(' ', name_str)
+    name_str = _DOT_SPACING_RE.sub('.', name_str)
+    name_str = _OPEN_PAREN_SPACING_RE.sub(' (', name_str)
+    name_str = _CLOSE_PAREN_SPACING_RE.sub(') ', name_str)
+    name_str = _DASH_SPACING_RE.sub('-', name_str)
+    
+    # Remove trailing/leading commas and dots
+    name_str = _EDGE_PUNCTUATION_RE.sub('', name_str)
+    
+    return name_str.strip()
+
+# Ista surova imena se v podatkih pogosto ponavljajo, zato rezultate hranimo v LRU predpomnilniku
+_standardize_name_cached = lru_cache(maxsize=STANDARDIZE_CACHE_SIZE)(_standardize_name_str)
+
+def standardize_name(name):
+    """Standardize product names to identical format"""
+    if is_missing(name):
+        return ""
+    
+    return _standardize_name_cached(str(name))
+
+def standardize_cache_info():
+    """Return hit/miss statistics of the standardize_name cache"""
+    return _standardize_name_cached.cache_info()
+
+def clear_standardize_cache():
+    """Empty the standardize_name cache and reset its statistics"""
+    _standardize_name_cached.cache_clear()
+
+def clean_price(price_value):
+    """Extract and clean price to float"""
+    if is_missing(price_value):
+        return None
+    
+    price_str = str(price_value)
+    price_str = re.sub(r'[^\d,\.]', '', price_str)
+    
+    if ',' in price_str and '.' in price_str:
+        price_str = price_str.replace('.', '').replace(',', '.')
+    elif ',' in price_str:
+        price_str = price_str.replace(',', '.')
+    
+    try:
+        return float(price_str)
+    except ValueError:
+        return None
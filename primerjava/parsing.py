@@ -0,0 +1,182 @@
+"""Volume extraction, parsed product records and match keys"""
+import math
+import re
+
+from .keywords import _brand_from_hits, _flavor_from_hits, scan_keywords
+
+# Faktorji za pretvorbo enot v ML
+UNIT_TO_ML = {'ML': 1, 'L': 1000, 'CL': 10, 'DL': 100}
+
+# Paketi (npr. 4X250ML, 6X0.33L) in posamezni izdelki (npr. 250ML, 0.5L)
+PACKAGE_VOLUME_RE = re.compile(r'(\d+)X(\d*\.?\d+)(ML|L|CL|DL)\b')
+SINGLE_VOLUME_RE = re.compile(r'(?<![\dX])(\d*\.?\d+)(ML|L|CL|DL)\b')
+
+# Največji volumen (ML), ki ga Int64 stolpci hranijo natančno; absurdno večji volumni (npr. 20-mestna
+# števila) se štejejo kot neznani
+MAX_VOLUME_ML = 2**53
+
+def _volume_fits(volume_ml, count):
+    """Whether count < MAX_VOLUME_ML and count x round(volume_ml) <= MAX_VOLUME_ML (same test as extract_volumes)"""
+    try:
+        count = float(count)
+    except OverflowError:
+        return False
+    return math.isfinite(volume_ml) and count < MAX_VOLUME_ML and float(round(volume_ml)) * count <= MAX_VOLUME_ML
+
+def extract_and_standardize_volume(name):
+    """
+    Extract and standardize volume from name - IMPORTANT: differentiate packages from single items
+    Returns: (volume_string, volume_ml, is_package, package_count, single_unit_ml)
+    """
+    name_upper = name.upper()
+    
+    # FIRST: Check for PACKAGE notation (e.g., 4X250ML, 6X0.33L, 4X0.5L)
+    # More flexible regex that handles various formats
+    package_match = PACKAGE_VOLUME_RE.search(name_upper)
+    if package_match:
+        count = int(package_match.group(1))
+        volume_num = float(package_match.group(2))
+        unit = package_match.group(3)
+        
+        # Convert to ML
+        if unit == 'L':
+            volume_ml = volume_num * 1000
+        elif unit == 'CL':
+            volume_ml = volume_num * 10
+        elif unit == 'DL':
+            volume_ml = volume_num * 100
+        else:
+            volume_ml = volume_num
+        
+        if not _volume_fits(volume_ml, count):
+            return None, None, False, None, None
+        
+        # Round to avoid floating point errors
+        volume_ml = round(volume_ml)
+        
+        # This is a PACKAGE - store SINGLE unit volume
+        volume_str = f"PACK_{count}X{int(volume_ml)}ML"
+        
+        # Total volume for the entire package
+        total_ml = volume_ml * count
+        
+        return volume_str, total_ml, True, count, volume_ml
+    
+    # SECOND: Check for SINGLE ITEM volume (e.g., 250ML, 0.5L, 33CL, 500ML)
+    # Match standalone volume (not preceded by number and X)
+    volume_match = SINGLE_VOLUME_RE.search(name_upper)
+    if volume_match:
+        volume_num = float(volume_match.group(1))
+        unit = volume_match.group(2)
+        
+        # Convert to ML
+        if unit == 'L':
+            volume_ml = volume_num * 1000
+        elif unit == 'CL':
+            volume_ml = volume_num * 10
+        elif unit == 'DL':
+            volume_ml = volume_num * 100
+        else:
+            volume_ml = volume_num
+        
+        if not _volume_fits(volume_ml, 1):
+            return None, None, False, None, None
+        
+        # Round to avoid floating point errors
+        volume_ml = round(volume_ml)
+        
+        # This is a SINGLE ITEM
+        volume_str = f"SINGLE_{int(volume_ml)}ML"
+        
+        return volume_str, volume_ml, False, 1, volume_ml
+    
+    return None, None, False, None, None
+
+class ParsedProduct:
+    """Immutable result of parsing one standardized product name"""
+    __slots__ = ('brand', 'flavor', 'volume_str', 'volume_ml', 'is_package',
+                 'package_count', 'single_unit_ml', 'match_key')
+    
+    def __init__(self, brand, flavor, volume_str, volume_ml, is_package,
+                 package_count, single_unit_ml, match_key):
+        for field, value in zip(self.__slots__, (brand, flavor, volume_str, volume_ml, is_package,
+                                                 package_count, single_unit_ml, match_key)):
+            object.__setattr__(self, field, value)
+    
+    def __setattr__(self, field, value):
+        raise AttributeError(f"ParsedProduct is immutable (cannot set '{field}')")
+    
+    def __delattr__(self, field):
+        raise AttributeError(f"ParsedProduct is immutable (cannot delete '{field}')")
+    
+    def astuple(self):
+        return tuple(getattr(self, field) for field in self.__slots__)
+    
+    def __reduce__(self):
+        return (ParsedProduct, self.astuple())
+    
+    def __eq__(self, other):
+        if not isinstance(other, ParsedProduct):
+            return NotImplemented
+        return self.astuple() == other.astuple()
+    
+    def __hash__(self):
+        return hash(self.astuple())
+    
+    def __repr__(self):
+        fields = ', '.join(f"{field}={getattr(self, field)!r}" for field in self.__slots__)
+        return f"ParsedProduct({fields})"
+
+class Product:
+    """One priced product from a store, together with its parsed name"""
+    __slots__ = ('original_name', 'name', 'price', 'source', 'parsed')
+    
+    def __init__(self, original_name, name, price, source, parsed):
+        self.original_name = original_name
+        self.name = name
+        self.price = price
+        self.source = source
+        self.parsed = parsed
+
+def build_flavor_key(brand, flavor):
+    """Flavor part of the match key"""
+    # Create flavor key - zdaj je BOLJ POMEMBEN za ujemanje
+    if flavor:
+        # Za Oshee izdelke moramo natančno razlikovati okuse
+        if brand == 'OSHEE':
+            return "_".join(flavor)
+        # Uporabimo samo prve 3 okuse, da preprečimo prevelike ključe
+        return "_".join(flavor[:3])
+    return "NOFLAVOR"
+
+def build_match_key(brand, flavor, volume_str):
+    """
+    Create a unique key for matching based on brand, flavor, and volume
+    CRITICALLY: This now differentiates packages from single items
+    """
+    # Use the full volume_str which includes PACK_ or SINGLE_ prefix
+    if volume_str:
+        volume_key = volume_str
+    else:
+        volume_key = "NOVOLUME"
+    
+    flavor_key = build_flavor_key(brand, flavor)
+    
+    # The match key now includes the PACK_ or SINGLE_ distinction
+    return f"{brand}_{flavor_key}_{volume_key}"
+
+def parse_product(name):
+    """Extract brand, flavor, volume and match key from a name in a single pass"""
+    name_upper = name.upper()
+    hits, word_hits = scan_keywords(name_upper)
+    brand = _brand_from_hits(hits)
+    flavor = _flavor_from_hits(name_upper, hits, word_hits)
+    volume_str, volume_ml, is_package, package_count, single_unit_ml = extract_and_standardize_volume(name_upper)
+    match_key = build_match_key(brand, flavor, volume_str)
+    
+    return ParsedProduct(brand, flavor, volume_str, volume_ml, is_package,
+                         package_count, single_unit_ml, match_key)
+
+def create_match_key(name):
+    """Create the match key of a name (see build_match_key)"""
+    return parse_product(name).match_key
@@ -0,0 +1,249 @@
+"""Out-of-core matching: spill parsed rows to hash partitions by match_key and join each partition alone"""
+import argparse
+import heapq
+import os
+import pickle
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from .catalog import MATCH_FIELDS, Catalog
+from .ingest import PRODUCT_COLUMNS, ingest_products
+from .metrics import METRICS
+from .snapshot import SNAPSHOT_DIR, iter_source
+
+# Privzeta omejitev pomnilnika (bajti) in število particij na nivo
+MEMORY_BUDGET = 512 * 2**20
+PARTITION_COUNT = 16
+
+# Ocena pomnilnika ene razčlenjene vrstice (tabela, katalog, indeksi) in enega ujemanja (Python vrednosti)
+PRODUCT_ROW_BYTES = 2048
+MATCH_ROW_BYTES = 2048
+
+# Prevelike particije razdelimo z novim zrnom zgoščevanja, največ toliko nivojev
+MAX_SPLIT_DEPTH = 4
+
+def parse_size(value):
+    """'512M', '2G', '65536' -> bytes"""
+    units = {'K': 2**10, 'M': 2**20, 'G': 2**30}
+    value = value.strip().upper().rstrip('B')
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+def partition_of(match_keys, count, seed=0):
+    """Partition (0..count-1) of every match_key; stable across processes and runs"""
+    hashes = pd.util.hash_array(np.asarray(match_keys, dtype=object), hash_key=f"primerjava{seed:06d}")
+    return (hashes % np.uint64(count)).astype(np.int64)
+
+class _Spill:
+    """Spill directory of one partitioning level: one pickle per (partition, source, chunk)"""
+    def __init__(self, directory, count, seed):
+        self.directory = directory
+        self.count = count
+        self.seed = seed
+        self.rows = np.zeros(count, dtype=np.int64)
+        self._chunks = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def partition_dir(self, partition):
+        return os.path.join(self.directory, f"{partition:04d}")
+
+    def add(self, source_index, products):
+        """Split a product table (with its 'position' column) by partition and write the parts"""
+        if not len(products):
+            return
+        partitions = partition_of(products['match_key'].to_numpy(dtype=object), self.count, self.seed)
+        order = np.argsort(partitions, kind='stable')
+        bounds = np.searchsorted(partitions[order], np.arange(self.count + 1))
+        for partition in np.flatnonzero(np.diff(bounds)):
+            part = products.iloc[order[bounds[partition]:bounds[partition + 1]]]
+            directory = self.partition_dir(partition)
+            os.makedirs(directory, exist_ok=True)
+            part.to_pickle(os.path.join(directory, f"{source_index:03d}-{self._chunks:06d}.pkl"))
+            self.rows[partition] += len(part)
+        self._chunks += 1
+
+def _read_partition(directory, n_sources):
+    """Product tables of one partition per source index, in input order"""
+    parts = [[] for _ in range(n_sources)]
+    for name in sorted(os.listdir(directory)):
+        parts[int(name[:3])].append(pd.read_pickle(os.path.join(directory, name)))
+    empty = pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in PRODUCT_COLUMNS.items()})
+    return [pd.concat(frames, ignore_index=True).sort_values('position', kind='stable', ignore_index=True)
+            if frames else empty for frames in parts]
+
+def _split(directory, rows, count, row_limit, depth=0):
+    """
+    Leaf partition directories of a spilled partition with the given number of rows
+    A partition above row_limit is partitioned again with the next seed, file by file. One
+    match_key always stays in one partition, so a key larger than the budget is joined whole.
+    """
+    if rows <= row_limit or depth >= MAX_SPLIT_DEPTH:
+        return [directory]
+
+    spill = _Spill(os.path.join(directory, 'split'), count, seed=depth + 1)
+    for name in sorted(name for name in os.listdir(directory) if name.endswith('.pkl')):
+        path = os.path.join(directory, name)
+        spill.add(int(name[:3]), pd.read_pickle(path))
+        os.remove(path)
+    if spill.rows.max() == rows:
+        # Vse vrstice imajo isti ključ - delitev ne pomaga
+        return [spill.partition_dir(int(np.argmax(spill.rows)))]
+    return [leaf for partition in np.flatnonzero(spill.rows)
+            for leaf in _split(spill.partition_dir(partition), spill.rows[partition], count, row_limit, depth + 1)]
+
+def _join_partition(directory, sources, batch_size):
+    """
+    Match one partition: every source pair's match batches go to one pickle stream in the
+    partition directory, in the in-memory order (match_key, left row, right row).
+    Returns {(left, right): (path, pairs)}.
+    """
+    frames = _read_partition(directory, len(sources))
+    catalog = Catalog(dict(zip(sources, frames)))
+    del frames
+    key_ids, group_ids = catalog.group_keys()
+
+    outputs = {}
+    for left_source, right_source in combinations(sources, 2):
+        path = os.path.join(directory, f"matches-{sources.index(left_source)}-{sources.index(right_source)}.pkl")
+        pairs = 0
+        with open(path, 'wb') as f:
+            for left_rows, right_rows in catalog.iter_pair_batches(key_ids, group_ids, left_source, right_source,
+                                                                   batch_size=batch_size):
+                batch = catalog.match_batch(left_rows, right_rows)
+                pickle.dump({field: values.tolist() if isinstance(values, np.ndarray) else values
+                             for field, values in batch.items()}, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pairs += len(left_rows)
+        outputs[(left_source, right_source)] = (path, pairs)
+    return outputs
+
+def _runs(path):
+    """(match_key, columns) runs of one key from a partition's match stream"""
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                batch = pickle.load(f)
+            except EOFError:
+                return
+            keys = np.asarray(batch['match_key'], dtype=object)
+            starts = [0, *(np.flatnonzero(keys[1:] != keys[:-1]) + 1).tolist(), len(keys)]
+            for start, stop in zip(starts, starts[1:]):
+                yield keys[start], {field: values[start:stop] for field, values in batch.items()}
+
+def _merge(paths, batch_size):
+    """k-way merge of partition match streams by match_key, in batches of about batch_size pairs"""
+    batch = {field: [] for field in MATCH_FIELDS}
+    rows = 0
+    for _, run in heapq.merge(*(_runs(path) for path in paths), key=lambda item: item[0]):
+        for field in MATCH_FIELDS:
+            batch[field].extend(run[field])
+        rows += len(run['match_key'])
+        if rows >= batch_size:
+            yield batch
+            batch = {field: [] for field in MATCH_FIELDS}
+            rows = 0
+    if rows:
+        yield batch
+
+def out_of_core_matches(sources, memory_budget=MEMORY_BUDGET, partitions=PARTITION_COUNT, workers=1,
+                        spill_dir=None, snapshot_dir=SNAPSHOT_DIR, cache=None):
+    """
+    Match batches ((left_source, right_source, MATCH_FIELDS columns)) of all source pairs, with the
+    same rows in the same order as Catalog.iter_pair_batches + match_batch on the whole input
+    Input is read and parsed in chunks and spilled to hash partitions by match_key; each
+    partition is joined on its own (in parallel with workers > 1) and the per-partition results
+    are merged by match_key. Each worker keeps roughly memory_budget / workers in memory.
+    """
+    source_names = [config.source for config in sources]
+    worker_budget = memory_budget // max(workers, 1)
+    chunk_rows = max(1000, worker_budget // (4 * PRODUCT_ROW_BYTES))
+    row_limit = max(1000, worker_budget // PRODUCT_ROW_BYTES)
+    # Med zlivanjem je v pomnilniku en paket vsake particije
+    batch_size = max(256, worker_budget // (2 * partitions * MATCH_ROW_BYTES))
+
+    directory = tempfile.mkdtemp(prefix='primerjava-spill-', dir=spill_dir)
+    try:
+        spill = _Spill(os.path.join(directory, 'spill'), partitions, seed=0)
+        with METRICS.stage('partition.spill'):
+            for source_index, config in enumerate(sources):
+                position = 0
+                for chunk in iter_source(config, snapshot_dir, chunk_rows):
+                    products = ingest_products(chunk, config.name_column, config.price_column, config.source,
+                                               cache=cache, workers=workers)
+                    # Položaj vrstice v viru ohrani vrstni red vhoda čez kose
+                    products['position'] = np.arange(position, position + len(products))
+                    position += len(products)
+                    spill.add(source_index, products)
+                    METRICS.add_rows('partition.spill', len(chunk))
+
+        leaves = [leaf for partition in np.flatnonzero(spill.rows)
+                  for leaf in _split(spill.partition_dir(partition), spill.rows[partition], partitions, row_limit)]
+
+        with METRICS.stage('partition.join', int(spill.rows.sum())):
+            if workers > 1 and len(leaves) > 1:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    outputs = list(executor.map(_join_partition, leaves, [source_names] * len(leaves),
+                                                [batch_size] * len(leaves)))
+            else:
+                outputs = [_join_partition(leaf, source_names, batch_size) for leaf in leaves]
+
+        for left_source, right_source in combinations(source_names, 2):
+            paths = [output[(left_source, right_source)][0] for output in outputs
+                     if output[(left_source, right_source)][1]]
+            for batch in _merge(paths, batch_size):
+                yield left_source, right_source, batch
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+def main(argv=None):
+    """Command line entry point: python -m primerjava.partition"""
+    from .cache import PARSE_CACHE_PATH, ParseCache
+    from .sources import SOURCES, SourceConfig
+    from .writers import OUTPUT_FORMATS, open_writer
+
+    parser = argparse.ArgumentParser(prog='primerjava.partition',
+                                     description='Primerjava velikih katalogov z delitvijo na disk.')
+    parser.add_argument('--source', nargs=4, action='append',
+                        metavar=('NAME', 'PATH', 'NAME_COLUMN', 'PRICE_COLUMN'),
+                        help='trgovina (lahko večkrat); privzeto Spar in Mercator')
+    parser.add_argument('--output', metavar='PATH', required=True,
+                        help='zapiši ujemanja v datoteko (.csv, .jsonl ali .parquet), kot main.py --output')
+    parser.add_argument('--output-format', choices=sorted(set(OUTPUT_FORMATS.values())), default=None)
+    parser.add_argument('--memory-budget', type=parse_size, default=MEMORY_BUDGET, metavar='SIZE',
+                        help='omejitev pomnilnika, npr. 256M ali 2G (privzeto 512M)')
+    parser.add_argument('--partitions', type=int, default=PARTITION_COUNT, help='število particij na nivo')
+    parser.add_argument('--workers', type=int, default=1, help='število procesov za razčlenjevanje in ujemanje')
+    parser.add_argument('--spill-dir', metavar='DIR', default=None, help='mapa za začasne particije')
+    parser.add_argument('--no-parse-cache', action='store_true', help='ne uporabi predpomnilnika razčlenjenih imen')
+    args = parser.parse_args(argv)
+
+    sources = [SourceConfig(*values) for values in args.source] if args.source else SOURCES
+    # Neznana končnica ali parquet brez pyarrow
+    try:
+        writer = open_writer(args.output, MATCH_FIELDS, args.output_format)
+    except (ValueError, RuntimeError) as e:
+        print(f"Napaka pri izhodni datoteki: {e}")
+        return 1
+    
+    cache = None if args.no_parse_cache else ParseCache(PARSE_CACHE_PATH)
+    try:
+        with writer:
+            for _, _, batch in out_of_core_matches(sources, args.memory_budget, args.partitions, args.workers,
+                                                   args.spill_dir, SNAPSHOT_DIR, cache):
+                writer.write_batch(batch)
+    except FileNotFoundError as e:
+        print(f"Napaka pri branju datotek: {e}")
+        return 1
+    finally:
+        if cache is not None:
+            cache.close()
+    print(f"Ujemanja zapisana v {args.output} ({writer.rows_written} vrstic)")
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
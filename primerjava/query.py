@@ -0,0 +1,98 @@
+"""Secondary indexes and set queries over a Catalog"""
+import numpy as np
+
+class CodeIndex:
+    """Rows of every code of one int column (rows sorted by code, with offsets per code)"""
+    def __init__(self, codes, n_codes):
+        # Manjkajoča vrednost (-1) dobi svoj predal na začetku
+        shifted = codes.astype(np.int64) + 1
+        self.order = np.argsort(shifted, kind='stable')
+        self.offsets = np.searchsorted(shifted[self.order], np.arange(n_codes + 2))
+    
+    def rows(self, code):
+        """Sorted rows with this code (-1 for missing)"""
+        return self.order[self.offsets[code + 1]:self.offsets[code + 2]]
+
+class CatalogIndex:
+    """
+    Secondary indexes of a Catalog on brand, flavor token, volume, package flag and name
+    Every query returns a sorted array of row numbers, so reports combine them with
+    intersect/union/difference instead of scanning product lists.
+    """
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self._brand = CodeIndex(catalog.brand_codes, len(catalog.brands))
+        self._flavor = CodeIndex(catalog.flavor_codes, len(catalog.flavors))
+        self._volume = CodeIndex(catalog.volume_codes, len(catalog.volume_strs))
+        self._name = CodeIndex(catalog.name_codes, len(catalog.strings))
+        self._package = {flag: np.flatnonzero(catalog.is_package == flag) for flag in (False, True)}
+        
+        self._brand_codes = {brand: code for code, brand in enumerate(catalog.brands)}
+        self._volume_codes = {volume: code for code, volume in enumerate(catalog.volume_strs)}
+        self._no_flavor_code = next((code for code, flavor in enumerate(catalog.flavors) if not flavor), None)
+        self._flavor_token_codes = {}
+        for code, flavor in enumerate(catalog.flavors):
+            for token in flavor:
+                self._flavor_token_codes.setdefault(token, []).append(code)
+        self._name_code_set = np.zeros(len(catalog.strings), dtype=bool)
+        self._name_code_set[catalog.name_codes] = True
+        self._contains_cache = {}
+    
+    def brand(self, brand):
+        code = self._brand_codes.get(brand)
+        return self._brand.rows(code) if code is not None else _EMPTY
+    
+    def flavor(self, token):
+        """Rows whose flavor tuple contains a token (e.g. 'POMARANCA')"""
+        codes = self._flavor_token_codes.get(token, [])
+        return np.sort(np.concatenate([self._flavor.rows(code) for code in codes])) if codes else _EMPTY
+    
+    def no_flavor(self):
+        """Rows without any flavor (NOFLAVOR)"""
+        code = self._no_flavor_code
+        return self._flavor.rows(code) if code is not None else _EMPTY
+    
+    def volume(self, volume_str):
+        """Rows with a volume_str (None = NOVOLUME)"""
+        if volume_str is None:
+            return self._volume.rows(-1)
+        code = self._volume_codes.get(volume_str)
+        return self._volume.rows(code) if code is not None else _EMPTY
+    
+    def package(self, is_package=True):
+        return self._package[bool(is_package)]
+    
+    def name_contains(self, *substrings):
+        """Rows whose standardized name contains all substrings (case-insensitive), one scan per distinct name"""
+        key = tuple(substring.upper() for substring in substrings)
+        codes = self._contains_cache.get(key)
+        if codes is None:
+            codes = [code for code, name in enumerate(self.catalog.strings)
+                     if self._name_code_set[code] and all(substring in name.upper() for substring in key)]
+            self._contains_cache[key] = codes
+        return np.sort(np.concatenate([self._name.rows(code) for code in codes])) if codes else _EMPTY
+    
+    def select(self, brand=None, flavor=None, volume_str=None, is_package=None):
+        """Intersection of the given criteria; with no criteria all rows"""
+        result = None
+        if brand is not None:
+            result = self.brand(brand)
+        if flavor is not None:
+            result = self.flavor(flavor) if result is None else intersect(result, self.flavor(flavor))
+        if volume_str is not None:
+            result = self.volume(volume_str) if result is None else intersect(result, self.volume(volume_str))
+        if is_package is not None:
+            result = self.package(is_package) if result is None else intersect(result, self.package(is_package))
+        return np.arange(len(self.catalog)) if result is None else result
+
+def intersect(rows, other):
+    return np.intersect1d(rows, other, assume_unique=True)
+
+def union(rows, other):
+    return np.union1d(rows, other)
+
+def difference(rows, other):
+    """Rows not in other (keeps the sorted order)"""
+    return np.setdiff1d(rows, other, assume_unique=True)
+
+_EMPTY = np.empty(0, dtype=np.int64)
@@ -0,0 +1,235 @@
+"""Resident price-lookup service over a preloaded match-key index"""
+import argparse
+import asyncio
+import json
+import signal
+from bisect import bisect_left
+from collections import defaultdict
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .metrics import METRICS
+from .normalize import standardize_name
+from .parsing import parse_product
+from .sources import SOURCES, SourceConfig
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+PREFIX_LIMIT = 50
+
+# Največja dolžina zahtevka (vrstica in glave)
+_MAX_HEADER_BYTES = 16384
+
+class PriceIndex:
+    """
+    Immutable lookup structure over parsed catalogs
+    Offers are grouped by match_key; a sorted key list answers brand/flavor prefix queries.
+    """
+    def __init__(self, products_by_source):
+        offers = defaultdict(list)
+        for source, products in products_by_source.items():
+            for product in products:
+                offers[product.parsed.match_key].append(product)
+        
+        self.sources = list(products_by_source)
+        self.offers = dict(offers)
+        self.keys = sorted(self.offers)
+        self.product_count = sum(len(products) for products in products_by_source.values())
+    
+    def summary(self, match_key):
+        """Offers of one key with the cheapest price per source, or None for an unknown key"""
+        products = self.offers.get(match_key)
+        if products is None:
+            return None
+        
+        by_source = {}
+        for product in products:
+            if product.source not in by_source or product.price < by_source[product.source]:
+                by_source[product.source] = product.price
+        cheapest = min(products, key=lambda product: product.price)
+        
+        return {
+            'match_key': match_key,
+            'by_source': by_source,
+            'cheapest': {'source': cheapest.source, 'name': cheapest.name, 'price': cheapest.price},
+            'offers': [{'source': product.source, 'name': product.name, 'price': product.price}
+                       for product in products],
+        }
+    
+    def lookup_name(self, raw_name):
+        """Parse a raw product name and look up its match key"""
+        name = standardize_name(raw_name)
+        parsed = parse_product(name)
+        return {
+            'name': name,
+            'parsed': {field: getattr(parsed, field) for field in parsed.__slots__},
+            'result': self.summary(parsed.match_key),
+        }
+    
+    def prefix(self, prefix, limit=PREFIX_LIMIT):
+        """Summaries of keys starting with a prefix (e.g. 'RED_BULL_' or 'OSHEE_LIMONA')"""
+        results = []
+        for key in self.keys[bisect_left(self.keys, prefix):]:
+            if not key.startswith(prefix) or len(results) >= limit:
+                break
+            summary = self.summary(key)
+            del summary['offers']
+            results.append(summary)
+        return results
+
+def load_frames(sources=SOURCES, snapshot_dir=None, parse_cache_path=None, workers=1):
+    """Read and parse all configured stores into {source: product table from ingest_products}"""
+    from .cache import PARSE_CACHE_PATH, ParseCache
+    from .ingest import ingest_products
+    from .snapshot import SNAPSHOT_DIR, read_source
+    
+    frames = {}
+    with ParseCache(parse_cache_path or PARSE_CACHE_PATH) as parse_cache:
+        for config in sources:
+            df = read_source(config, snapshot_dir or SNAPSHOT_DIR)
+            frames[config.source] = ingest_products(df, config.name_column, config.price_column, config.source,
+                                                    cache=parse_cache, workers=workers)
+    return frames
+
+def load_products(sources=SOURCES, snapshot_dir=None, parse_cache_path=None, workers=1):
+    """Read and parse all configured stores into {source: [Product]}"""
+    from .ingest import products_from_frame
+    
+    frames = load_frames(sources, snapshot_dir, parse_cache_path, workers)
+    return {source: products_from_frame(frame) for source, frame in frames.items()}
+
+class ReloadError(Exception):
+    """Building a new index failed; the service keeps the previous one"""
+
+class PriceService:
+    """
+    asyncio HTTP service answering point queries from a PriceIndex
+    GET /lookup?name=..., GET /key/<match_key>, GET /prefix?prefix=...&limit=..., POST /reload, GET /health,
+    GET /metrics (Prometheus text)
+    Reload builds a new index in a worker thread and swaps it in atomically; requests in
+    flight keep using the index they started with.
+    """
+    def __init__(self, loader):
+        self.loader = loader
+        self.index = None
+        self.generation = 0
+        self._reload_lock = asyncio.Lock()
+    
+    async def reload(self):
+        """Build a fresh index from the loader and swap it in; raises ReloadError if loading fails"""
+        async with self._reload_lock:
+            loop = asyncio.get_running_loop()
+            try:
+                with METRICS.stage('reload'):
+                    index = await loop.run_in_executor(None, lambda: PriceIndex(self.loader()))
+            except Exception as e:
+                # Stari indeks ostane v uporabi
+                raise ReloadError(f"{type(e).__name__}: {e}") from e
+            self.index = index
+            self.generation += 1
+            return {'generation': self.generation, 'products': index.product_count, 'keys': len(index.keys)}
+    
+    async def _reload_on_signal(self):
+        """SIGHUP reload; a failure is reported instead of being left in the task"""
+        try:
+            result = await self.reload()
+        except ReloadError as e:
+            print(f"Reload failed, keeping generation {self.generation}: {e}")
+        else:
+            print(f"Reloaded generation {result['generation']}: {result['products']} products")
+    
+    async def dispatch(self, method, target):
+        """Route one request; returns (status, payload)"""
+        index = self.index
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        
+        if url.path == '/reload' and method == 'POST':
+            try:
+                return 200, await self.reload()
+            except ReloadError as e:
+                return 500, {'error': f"reload failed: {e}", 'generation': self.generation}
+        if method != 'GET':
+            return 405, {'error': 'method not allowed'}
+        if url.path == '/metrics':
+            return 200, METRICS.to_prometheus()
+        if url.path == '/health':
+            return 200, {'generation': self.generation, 'products': index.product_count, 'keys': len(index.keys)}
+        if url.path == '/lookup' and 'name' in query:
+            return 200, index.lookup_name(query['name'])
+        if url.path.startswith('/key/'):
+            summary = index.summary(unquote(url.path[len('/key/'):]))
+            return (200, summary) if summary is not None else (404, {'error': 'unknown match key'})
+        if url.path == '/prefix' and 'prefix' in query:
+            limit = int(query.get('limit', PREFIX_LIMIT))
+            return 200, {'results': index.prefix(query['prefix'].upper(), limit)}
+        return 404, {'error': 'not found'}
+    
+    async def handle(self, reader, writer):
+        """Serve one HTTP/1.1 request per connection"""
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+            if len(head) > _MAX_HEADER_BYTES:
+                raise ValueError('request too large')
+            method, target, _ = head.split(b'\r\n', 1)[0].decode('latin-1').split(' ', 2)
+            status, payload = await self.dispatch(method, target)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError) as e:
+            status, payload = 400, {'error': str(e) or 'bad request'}
+        
+        if isinstance(payload, str):
+            body = payload.encode('utf-8')
+            content_type = b'text/plain; version=0.0.4; charset=utf-8'
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            content_type = b'application/json; charset=utf-8'
+        writer.write(b'HTTP/1.1 %d %s\r\n' % (status, _REASONS.get(status, 'Error').encode()) +
+                     b'Content-Type: ' + content_type + b'\r\n' +
+                     b'Content-Length: %d\r\nConnection: close\r\n\r\n' % len(body) + body)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+    
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        """Load the index once and serve until cancelled (SIGHUP triggers a reload)"""
+        await self.reload()
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle, path=unix_path)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        
+        loop = asyncio.get_running_loop()
+        if hasattr(signal, 'SIGHUP'):
+            loop.add_signal_handler(signal.SIGHUP, lambda: loop.create_task(self._reload_on_signal()))
+        
+        print(f"Serving {self.index.product_count} products ({len(self.index.keys)} keys) on "
+              f"{unix_path or f'http://{host}:{port}'}")
+        async with server:
+            await server.serve_forever()
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+def main(argv=None):
+    """Command line entry point: python -m primerjava.service"""
+    parser = argparse.ArgumentParser(prog='primerjava.service', description='Storitev za iskanje cen.')
+    parser.add_argument('--source', nargs=4, action='append',
+                        metavar=('NAME', 'PATH', 'NAME_COLUMN', 'PRICE_COLUMN'),
+                        help='trgovina (lahko večkrat); privzeto Spar in Mercator')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--unix', metavar='PATH', default=None, help='poslušaj na Unix vtičnici namesto TCP')
+    parser.add_argument('--workers', type=int, default=1, help='število procesov za razčlenjevanje imen')
+    args = parser.parse_args(argv)
+    
+    sources = [SourceConfig(*values) for values in args.source] if args.source else SOURCES
+    service = PriceService(lambda: load_products(sources, workers=args.workers))
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.unix))
+    except ReloadError as e:
+        print(f"Napaka pri branju datotek: {e}")
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
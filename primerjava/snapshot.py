@@ -0,0 +1,124 @@
+"""Columnar (Arrow IPC) snapshots of store workbooks"""
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # posnetki so neobvezni
+    pa = None
+
+# Stolpčni posnetki (Arrow IPC) prebranih Excel datotek
+SNAPSHOT_DIR = '.snapshots'
+
+# Privzeta velikost kosa pri branju po kosih (iter_source)
+SOURCE_CHUNK_ROWS = 100000
+
+# Napake pri branju posnetka, po katerih ga zgradimo znova (pa.ArrowInvalid je ValueError,
+# TypeError pomeni posnetek brez metapodatkov)
+_UNUSABLE_SNAPSHOT = (OSError, KeyError, TypeError, ValueError)
+
+def file_fingerprint(path):
+    """Size, modification time and SHA-256 of a file"""
+    stat = os.stat(path)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+
+def _snapshot_path(config, snapshot_dir):
+    """Snapshot file of a workbook; the hash of its absolute path keeps a/spar.xlsx and b/spar.xlsx apart"""
+    base = os.path.basename(config.path)
+    path_hash = hashlib.sha1(os.path.abspath(config.path).encode('utf-8')).hexdigest()[:12]
+    return os.path.join(snapshot_dir, f"{base}.{path_hash}.{config.name_column}.{config.price_column}.arrow")
+
+def _read_excel_columns(config):
+    """Read only the name and price columns of a workbook (missing columns are skipped)"""
+    columns = (config.name_column, config.price_column)
+    df = pd.read_excel(config.path, usecols=lambda column: column in columns)
+    # Arrow ne dovoli mešanih tipov v stolpcu - shranimo str(vrednost), kot jo uporablja obdelava
+    return df.astype(object).map(lambda value: None if pd.isna(value) else str(value))
+
+def _load_snapshot(snapshot_path):
+    """Memory-map a snapshot and return (DataFrame, stored fingerprint), or None if unusable"""
+    try:
+        table = pa.ipc.open_file(pa.memory_map(snapshot_path, 'r')).read_all()
+        fingerprint = json.loads(table.schema.metadata[b'source_fingerprint'])
+    except _UNUSABLE_SNAPSHOT:
+        return None
+    return table.to_pandas(), fingerprint
+
+def _snapshot_is_current(config, snapshot_path):
+    """Whether a snapshot exists with the workbook's size and mtime (reads only the schema)"""
+    try:
+        metadata = pa.ipc.open_file(pa.memory_map(snapshot_path, 'r')).schema.metadata
+        stored = json.loads(metadata[b'source_fingerprint'])
+    except _UNUSABLE_SNAPSHOT:
+        return False
+    stat = os.stat(config.path)
+    return stored['size'] == stat.st_size and stored['mtime_ns'] == stat.st_mtime_ns
+
+def _write_snapshot(snapshot_path, df, fingerprint):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({'source_fingerprint': json.dumps(fingerprint)})
+    os.makedirs(os.path.dirname(snapshot_path) or '.', exist_ok=True)
+    
+    # Pišemo v začasno datoteko, da bralec nikoli ne vidi napol zapisanega posnetka
+    temp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    with pa.OSFile(temp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(temp_path, snapshot_path)
+
+def read_source(config, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Read the name and price columns of a store workbook
+    The workbook is converted once into an Arrow IPC snapshot; later reads memory-map the
+    snapshot as long as the workbook's size and mtime (or, if those changed, its SHA-256)
+    are unchanged. Without pyarrow the workbook is read directly.
+    """
+    if pa is None or snapshot_dir is None:
+        return _read_excel_columns(config)
+    
+    stat = os.stat(config.path)
+    snapshot_path = _snapshot_path(config, snapshot_dir)
+    snapshot = _load_snapshot(snapshot_path) if os.path.exists(snapshot_path) else None
+    
+    if snapshot is not None:
+        df, stored = snapshot
+        if stored['size'] == stat.st_size and stored['mtime_ns'] == stat.st_mtime_ns:
+            return df
+        # Datoteka je bila dotaknjena - preverimo, ali se je vsebina res spremenila
+        fingerprint = file_fingerprint(config.path)
+        if fingerprint['sha256'] == stored['sha256']:
+            _write_snapshot(snapshot_path, df, fingerprint)
+            return df
+    else:
+        fingerprint = file_fingerprint(config.path)
+    
+    df = _read_excel_columns(config)
+    _write_snapshot(snapshot_path, df, fingerprint)
+    return df
+
+def iter_source(config, snapshot_dir=SNAPSHOT_DIR, chunk_rows=SOURCE_CHUNK_ROWS):
+    """
+    read_source in DataFrames of at most chunk_rows rows
+    The snapshot is memory-mapped and converted one slice at a time, so only the current chunk
+    is materialized; the workbook itself is read whole once, when its snapshot is (re)built.
+    """
+    if pa is None or snapshot_dir is None:
+        df = read_source(config, snapshot_dir)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows].reset_index(drop=True)
+        return
+    
+    snapshot_path = _snapshot_path(config, snapshot_dir)
+    if not _snapshot_is_current(config, snapshot_path):
+        # read_source preveri vsebino in po potrebi zgradi nov posnetek
+        read_source(config, snapshot_dir)
+    table = pa.ipc.open_file(pa.memory_map(snapshot_path, 'r')).read_all()
+    for start in range(0, table.num_rows, chunk_rows):
+        yield table.slice(start, chunk_rows).to_pandas()
@@ -0,0 +1,10 @@
+"""Configuration of the compared stores"""
+from collections import namedtuple
+
+# Trgovine, ki jih primerjamo: ime vira, datoteka, stolpec z imenom in stolpec s ceno
+SourceConfig = namedtuple('SourceConfig', ['source', 'path', 'name_column', 'price_column'])
+
+SOURCES = [
+    SourceConfig('Spar', 'spar.xlsx', 'name_0', 'price_0'),
+    SourceConfig('Mercator', 'mercator.xlsx', 'name', 'price3'),
+]
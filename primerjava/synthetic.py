@@ -0,0 +1,118 @@
+"""Synthetic Spar- and Mercator-style catalogs for benchmarks"""
+import random
+
+import pandas as pd
+
+from .keywords import BRANDS, FLAVOR_KEYWORDS
+from .sources import SourceConfig
+
+# Vrste izdelkov, kot se pojavljajo v imenih
+PRODUCT_TYPES = ['ENERGIJSKI NAPITEK', 'IZOTONIČNI NAPITEK', 'GAZIRANA PIJAČA', 'LEDENI ČAJ', 'ŠPORTNI NAPITEK']
+
+# Volumni v ml: (število kosov, volumen enega kosa)
+VOLUMES = [(1, 250), (1, 330), (1, 355), (1, 473), (1, 500), (1, 553), (1, 750), (1, 1000), (1, 1500),
+           (4, 250), (6, 330), (4, 500), (6, 500), (24, 250)]
+
+# Šum iz spletnih strani trgovin
+SPAR_NOISE = ['V KOŠARICO', 'NAKUP PAKETA 2 IZDELKOV', 'PONUDBA VELJA DO: 31.12.', 'PC30:0,00€', '2,76 €/ 1L', ' -20%']
+HTML_FRAGMENTS = ['<b>', '</b>', '<br/>', '<span class="x">', '</span>', '\n']
+
+# Brez znamk, ki so hkrati okusi (TANGERINA, ...)
+_BRANDS = [brand for brand in BRANDS if brand not in FLAVOR_KEYWORDS]
+
+# Stolpci sintetičnih katalogov so enaki kot v pravih datotekah
+SYNTHETIC_SOURCES = [
+    SourceConfig('Spar', 'spar_synthetic.xlsx', 'name_0', 'price_0'),
+    SourceConfig('Mercator', 'mercator_synthetic.xlsx', 'name', 'price3'),
+]
+
+def product_universe(size, seed=0):
+    """size distinct (brand, flavors, package_count, unit_ml, base_price) products shared by all stores"""
+    rng = random.Random(seed)
+    universe = {}
+    while len(universe) < size:
+        # Nekaj izdelkov brez znamke ali brez volumna (NOBRAND, NOVOLUME)
+        brand = rng.choice(_BRANDS) if rng.random() > 0.03 else None
+        flavors = tuple(rng.sample(FLAVOR_KEYWORDS, rng.choice([0, 1, 1, 1, 2])))
+        count, unit_ml = rng.choice(VOLUMES) if rng.random() > 0.02 else (1, None)
+        universe.setdefault((brand, flavors, count, unit_ml), round(rng.uniform(0.4, 3.5) * count, 2))
+    return [(*product, price) for product, price in universe.items()]
+
+def _decimal(value, sep=','):
+    """1.5 -> '1,5', 2.0 -> '2'"""
+    text = f'{value:g}'
+    return text.replace('.', sep)
+
+def spar_volume(rng, count, unit_ml):
+    """Volume in Spar style: 250ML, 0,5L, 4 X 0, 5 L, 4X250ML"""
+    if unit_ml >= 500 and rng.random() < 0.5:
+        unit = _decimal(unit_ml / 1000) + 'L'
+    else:
+        unit = f'{unit_ml}ML'
+    if count == 1:
+        return unit
+    if rng.random() < 0.5:
+        return f'{count}X{unit}'
+    return f'{count} X ' + unit.replace(',', ', ').replace('L', ' L').replace('M L', ' ML')
+
+def mercator_volume(rng, count, unit_ml):
+    """Volume in Mercator style: 250 ml, 0,5 l, 4 x 0,25 l"""
+    unit = f'{_decimal(unit_ml / 1000)} l' if rng.random() < 0.6 else f'{unit_ml} ml'
+    return unit if count == 1 else f'{count} x {unit}'
+
+def spar_row(rng, product):
+    """One Spar-style (name, price) row"""
+    brand, flavors, count, unit_ml, price = product
+    parts = [rng.choice(PRODUCT_TYPES)]
+    if flavors:
+        parts[0] += ' ' + ' IN '.join(flavors)
+    if brand:
+        parts.append(brand)
+    if unit_ml:
+        parts.append(spar_volume(rng, count, unit_ml))
+    name = ', '.join(parts)
+    
+    if rng.random() < 0.2:
+        name = f"{rng.choice(HTML_FRAGMENTS)}{name}{rng.choice(HTML_FRAGMENTS)}"
+    if rng.random() < 0.2:
+        name += ' ' + rng.choice(SPAR_NOISE)
+    if rng.random() < 0.05:
+        name = f"{rng.randint(1, 99)}. {name}"
+    
+    price = round(price * rng.uniform(0.85, 1.15), 2)
+    return name, f"{price:.2f} €".replace('.', ',')
+
+def mercator_row(rng, product):
+    """One Mercator-style (name, price) row"""
+    brand, flavors, count, unit_ml, price = product
+    parts = [rng.choice(PRODUCT_TYPES).capitalize()]
+    parts.extend(flavor.lower() for flavor in flavors)
+    if brand:
+        parts.append(brand.title())
+    if unit_ml:
+        parts.append(mercator_volume(rng, count, unit_ml))
+    
+    price = round(price * rng.uniform(0.85, 1.15), 2)
+    return ', '.join(parts), f"{price:.2f}".replace('.', ',')
+
+def generate_catalog(config, rows, universe, seed=0):
+    """DataFrame with `rows` synthetic rows in the column layout of config (Spar or Mercator style)"""
+    rng = random.Random(f'{seed}-{config.source}')
+    make_row = spar_row if config.name_column == 'name_0' else mercator_row
+    names = []
+    prices = []
+    for _ in range(rows):
+        name, price = make_row(rng, rng.choice(universe))
+        names.append(name)
+        prices.append(price)
+    return pd.DataFrame({config.name_column: names, config.price_column: prices})
+
+def generate_catalogs(total_rows, seed=0, sources=SYNTHETIC_SOURCES):
+    """
+    Catalogs of all sources with total_rows rows together
+    Stores draw from one shared product universe (about 2 rows per product per store),
+    so exact matches, unmatched products and duplicates all occur.
+    """
+    per_source = total_rows // len(sources)
+    universe = product_universe(max(100, per_source // 2), seed)
+    return {config.source: generate_catalog(config, per_source, universe, seed) for config in sources}
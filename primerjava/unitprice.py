@@ -0,0 +1,105 @@
+"""Unit-price (€/L) index for comparisons across pack sizes and stores"""
+import heapq
+from bisect import bisect_left
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+from .parsing import build_flavor_key
+
+# Najmanjše število ponudb (brand, okus), da ima "dobra ponudba" smisel
+DEAL_MIN_OFFERS = 2
+
+class UnitPriceIndex:
+    """
+    Catalog rows with a known volume sorted by (brand, flavor key, €/L)
+    The flavor key is the flavor part of match_key, so all pack sizes and stores of one
+    product line share a group; the cheapest rows of a group are a slice, and best deals
+    (largest discount against the group median €/L) are ranked once at build time.
+    """
+    def __init__(self, catalog, min_offers=DEAL_MIN_OFFERS):
+        self.catalog = catalog
+        rows = np.flatnonzero(~np.isnan(catalog.unit_price))
+        
+        # (brand, flavor_key) za vsak različen par kod znamke in okusa
+        n_flavors = max(len(catalog.flavors), 1)
+        pair_ids, pairs = pd.factorize(catalog.brand_codes[rows].astype(np.int64) * n_flavors + catalog.flavor_codes[rows])
+        group_keys = []
+        for pair in pairs:
+            brand = catalog.brands[pair // n_flavors]
+            group_keys.append((brand, build_flavor_key(brand, catalog.flavors[pair % n_flavors])))
+        
+        self.keys = sorted(set(group_keys))
+        key_rank = {key: rank for rank, key in enumerate(self.keys)}
+        groups = np.array([key_rank[key] for key in group_keys] or [0], dtype=np.int64)[pair_ids]
+        
+        unit_price = catalog.unit_price[rows]
+        order = np.lexsort((rows, unit_price, groups))
+        self.rows = rows[order]
+        self.groups = groups[order]
+        self.starts = np.searchsorted(self.groups, np.arange(len(self.keys) + 1))
+        
+        # Popust glede na mediano €/L skupine; rangiramo samo skupine z vsaj min_offers ponudbami
+        frame = pd.DataFrame({'group': self.groups, 'unit_price': catalog.unit_price[self.rows]})
+        median = frame.groupby('group')['unit_price'].transform('median').to_numpy()
+        self.discount = 1 - frame['unit_price'].to_numpy() / median
+        offers = np.diff(self.starts)[self.groups]
+        ranked = np.flatnonzero(offers >= min_offers)
+        self.deal_order = ranked[np.lexsort((self.rows[ranked], -self.discount[ranked]))]
+    
+    def __len__(self):
+        return len(self.rows)
+    
+    def _group_slices(self, brand, flavor_key=None):
+        """(start, end) slices of one (brand, flavor_key) group or of all flavors of a brand"""
+        if flavor_key is not None:
+            position = bisect_left(self.keys, (brand, flavor_key))
+            if position < len(self.keys) and self.keys[position] == (brand, flavor_key):
+                return [(self.starts[position], self.starts[position + 1])]
+            return []
+        
+        slices = []
+        for position in range(bisect_left(self.keys, (brand, '')), len(self.keys)):
+            if self.keys[position][0] != brand:
+                break
+            slices.append((self.starts[position], self.starts[position + 1]))
+        return slices
+    
+    def cheapest(self, brand, flavor_key=None, k=1):
+        """
+        k cheapest offers per litre of a brand and flavor key across all pack sizes and stores
+        Without flavor_key the sorted groups of all the brand's flavors are merged with a heap.
+        """
+        slices = self._group_slices(brand, flavor_key)
+        unit_price = self.catalog.unit_price
+        streams = [((unit_price[row], row) for row in self.rows[start:end].tolist()) for start, end in slices]
+        return [self.offer(row) for _, row in islice(heapq.merge(*streams), k)]
+    
+    def best_deals(self, k=10, brand=None):
+        """Top k offers by discount against the median €/L of their (brand, flavor key) group"""
+        positions = self.deal_order
+        if brand is not None:
+            brand_code = self.catalog.brands.index(brand) if brand in self.catalog.brands else -1
+            positions = positions[self.catalog.brand_codes[self.rows[positions]] == brand_code]
+        return [self.offer(self.rows[position], self.discount[position]) for position in positions[:k]]
+    
+    def offer(self, row, discount=None):
+        """Description of one catalog row as a dict"""
+        catalog = self.catalog
+        parsed = catalog.parsed(row)
+        result = {
+            'brand': parsed.brand,
+            'flavor_key': build_flavor_key(parsed.brand, parsed.flavor),
+            'match_key': parsed.match_key,
+            'source': catalog.sources[catalog.source_codes[row]],
+            'name': catalog.name(row),
+            'price': float(catalog.price[row]),
+            'volume_ml': parsed.volume_ml,
+            'is_package': parsed.is_package,
+            'package_count': parsed.package_count,
+            'unit_price': float(catalog.unit_price[row]),
+        }
+        if discount is not None:
+            result['discount'] = float(discount)
+        return result
@@ -0,0 +1,159 @@
+"""Streaming writers for match results and a bounded top-N ranking"""
+import csv
+import heapq
+import json
+import os
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet izhod je neobvezen
+    pa = None
+
+# Vrstice, ki jih pisalnik zbere, preden jih zapiše naenkrat
+WRITE_BATCH_SIZE = 10000
+
+OUTPUT_FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.parquet': 'parquet'}
+
+# Tipi Parquet stolpcev ujemanj, agregirane primerjave in sprememb; ostali stolpci so nizi
+PARQUET_TYPES = {
+    'volume_ml': 'int64', 'is_package': 'bool', 'package_count': 'int64',
+    'left_price': 'float64', 'right_price': 'float64',
+    'price_difference': 'float64', 'price_difference_percent': 'float64',
+    'left_count': 'int64', 'right_count': 'int64', 'pairs': 'int64',
+    'left_min': 'float64', 'left_median': 'float64', 'left_max': 'float64',
+    'right_min': 'float64', 'right_median': 'float64', 'right_max': 'float64',
+    'left_occurrence': 'int64', 'right_occurrence': 'int64', 'price_difference_old': 'float64',
+}
+
+def _rows(columns, fields):
+    """Column batch -> list of row tuples with plain Python values"""
+    return list(zip(*(columns[field].tolist() if isinstance(columns[field], np.ndarray) else columns[field]
+                      for field in fields)))
+
+class MatchWriter:
+    """
+    Base class of the streaming writers
+    write_batch() takes a batch of columns (field -> list or array); rows are buffered and
+    flushed every batch_size rows, so memory is bounded by the batch size, not the result size.
+    """
+    def __init__(self, path, fields, batch_size=WRITE_BATCH_SIZE):
+        self.path = path
+        self.fields = list(fields)
+        self.batch_size = batch_size
+        self.rows_written = 0
+        self._buffer = []
+    
+    def write_batch(self, columns):
+        self._buffer.extend(_rows(columns, self.fields))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        if self._buffer:
+            self._write_rows(self._buffer)
+            self.rows_written += len(self._buffer)
+            self._buffer = []
+    
+    def _write_rows(self, rows):
+        raise NotImplementedError
+    
+    def close(self):
+        self.flush()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+class CsvMatchWriter(MatchWriter):
+    def __init__(self, path, fields, batch_size=WRITE_BATCH_SIZE):
+        super().__init__(path, fields, batch_size)
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.fields)
+    
+    def _write_rows(self, rows):
+        self._writer.writerows(rows)
+    
+    def close(self):
+        super().close()
+        self._file.close()
+
+class JsonlMatchWriter(MatchWriter):
+    def __init__(self, path, fields, batch_size=WRITE_BATCH_SIZE):
+        super().__init__(path, fields, batch_size)
+        self._file = open(path, 'w', encoding='utf-8')
+    
+    def _write_rows(self, rows):
+        self._file.write(''.join(json.dumps(dict(zip(self.fields, row)), ensure_ascii=False) + '\n' for row in rows))
+    
+    def close(self):
+        super().close()
+        self._file.close()
+
+class ParquetMatchWriter(MatchWriter):
+    """Writes each flushed batch as one Parquet row group"""
+    def __init__(self, path, fields, batch_size=WRITE_BATCH_SIZE):
+        if pa is None:
+            raise RuntimeError("Parquet output requires pyarrow")
+        super().__init__(path, fields, batch_size)
+        self.schema = pa.schema([(field, pa.type_for_alias(PARQUET_TYPES.get(field, 'string'))) for field in self.fields])
+        self._writer = pq.ParquetWriter(path, self.schema)
+    
+    def _write_rows(self, rows):
+        columns = zip(*rows)
+        self._writer.write_table(pa.table([pa.array(values, type=field.type)
+                                           for field, values in zip(self.schema, columns)], schema=self.schema))
+    
+    def close(self):
+        super().close()
+        self._writer.close()
+
+_WRITERS = {'csv': CsvMatchWriter, 'jsonl': JsonlMatchWriter, 'parquet': ParquetMatchWriter}
+
+def open_writer(path, fields, output_format=None, batch_size=WRITE_BATCH_SIZE):
+    """Writer for a path; the format is taken from the extension unless given (csv, jsonl, parquet)"""
+    if output_format is None:
+        output_format = OUTPUT_FORMATS.get(os.path.splitext(path)[1].lower())
+        if output_format is None:
+            raise ValueError(f"Unknown output format of {path!r} (use .csv, .jsonl or .parquet)")
+    return _WRITERS[output_format](path, fields, batch_size)
+
+class TopN:
+    """
+    The n largest items by score, in the order of a stable descending sort of everything pushed
+    Items with equal scores keep push order. n=None keeps all items.
+    """
+    def __init__(self, n=None):
+        self.n = n
+        self._heap = []
+        self._count = 0
+    
+    def push_many(self, scores, items):
+        """Push a batch; scores is an array, items a sequence of the same length"""
+        if self.n is not None and self.n <= 0:
+            self._count += len(scores)
+            return
+        if self.n is not None and len(self._heap) >= self.n:
+            # Kandidat mora biti strogo boljši od trenutno najslabšega (enaki so prišli kasneje)
+            candidates = np.flatnonzero(scores > self._heap[0][0])
+        else:
+            candidates = range(len(scores))
+        for position in candidates:
+            entry = (float(scores[position]), -(self._count + int(position)), items[position])
+            if self.n is None or len(self._heap) < self.n:
+                heapq.heappush(self._heap, entry)
+            elif entry[:2] > self._heap[0][:2]:
+                heapq.heapreplace(self._heap, entry)
+        self._count += len(scores)
+    
+    def __len__(self):
+        return len(self._heap)
+    
+    def items(self):
+        """Kept items, best first"""
+        return [entry[2] for entry in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
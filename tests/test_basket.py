@@ -0,0 +1,26 @@
+"""Tests of basket input validation"""
+import numpy as np
+import pytest
+
+from primerjava.basket import BasketItem, _parse_fixed_costs, basket_items, plan_basket
+
+SOURCES = ['Spar', 'Mercator']
+
+def test_fixed_costs():
+    assert _parse_fixed_costs(['1,5'], SOURCES) == {'Spar': 1.5, 'Mercator': 1.5}
+    assert _parse_fixed_costs(['Spar=2', 'Mercator=0'], SOURCES) == {'Spar': 2.0, 'Mercator': 0.0}
+
+@pytest.mark.parametrize('value', ['-5', 'Spar=-0.01', 'inf', 'Spar=-inf', 'nan', 'abc'])
+def test_invalid_fixed_costs_are_rejected(value):
+    with pytest.raises(ValueError):
+        _parse_fixed_costs([value], SOURCES)
+
+def test_plan_rejects_negative_fixed_cost():
+    items = [BasketItem('a', 'A', 1.0)]
+    with pytest.raises(ValueError):
+        plan_basket(items, np.array([[1.0, 2.0]]), SOURCES, {'Spar': -1.0})
+
+@pytest.mark.parametrize('line', ['RED BULL 250ML;0', 'RED BULL 250ML;-1', 'RED BULL 250ML;nan'])
+def test_invalid_quantities_are_rejected(line):
+    with pytest.raises(ValueError):
+        basket_items([line])
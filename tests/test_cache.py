@@ -0,0 +1,42 @@
+"""Tests of run-based eviction and hit counting in ParseCache"""
+from primerjava.cache import ParseCache
+
+def test_runs_are_ordered_within_one_second(tmp_path):
+    path = tmp_path / 'cache.sqlite'
+    with ParseCache(path) as cache:
+        cache.parse_names(['RED BULL 250ML'])
+    with ParseCache(path) as cache:
+        cache.parse_names(['FANTA 1.5L'])
+    
+    # Tretji zagon takoj za prejšnjima mora izbrisati najstarejši vnos
+    with ParseCache(path, max_entries=2) as cache:
+        assert cache.run == 3
+        cache.parse_names(['OSHEE 0.5L'])
+        names = {row[0] for row in cache.connection.execute('SELECT raw_name FROM parsed_names')}
+    assert names == {'FANTA 1.5L', 'OSHEE 0.5L'}
+
+def test_current_run_is_never_evicted(tmp_path):
+    path = tmp_path / 'cache.sqlite'
+    with ParseCache(path) as cache:
+        cache.parse_names(['RED BULL 250ML'])
+    with ParseCache(path, max_entries=1) as cache:
+        cache.parse_names(['FANTA 1.5L', 'OSHEE 0.5L'])
+        assert len(cache) == 2
+
+def test_timestamp_cache_continues_after_last_used(tmp_path):
+    path = tmp_path / 'cache.sqlite'
+    with ParseCache(path) as cache:
+        cache.parse_names(['RED BULL 250ML'])
+        cache.connection.execute('DELETE FROM parse_runs')
+        cache.connection.execute('UPDATE parsed_names SET last_used = 1700000000')
+        cache.connection.commit()
+    with ParseCache(path) as cache:
+        assert cache.run == 1700000001
+
+def test_hits_and_misses_count_distinct_names(tmp_path):
+    path = tmp_path / 'cache.sqlite'
+    with ParseCache(path) as cache:
+        cache.parse_names(['RED BULL 250ML', 'RED BULL 250ML'])
+        assert (cache.hits, cache.misses) == (0, 1)
+        cache.parse_names(['RED BULL 250ML', 'RED BULL 250ML', 'RED BULL 250ML', 'FANTA 1.5L'])
+        assert (cache.hits, cache.misses) == (1, 2)
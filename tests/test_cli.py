@@ -0,0 +1,14 @@
+"""Tests of command line argument validation"""
+import pytest
+
+from primerjava.cli import parse_args
+
+@pytest.mark.parametrize('option', ['--chunk-size', '--max-pairs-per-key'])
+@pytest.mark.parametrize('value', ['0', '-1'])
+def test_non_positive_values_are_rejected(option, value):
+    with pytest.raises(SystemExit):
+        parse_args([option, value])
+
+def test_positive_values_are_accepted():
+    assert parse_args(['--chunk-size', '500']).chunk_size == 500
+    assert parse_args(['--max-pairs-per-key', '1']).max_pairs_per_key == 1
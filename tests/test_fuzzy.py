@@ -0,0 +1,25 @@
+"""Tests of approximate matching between stores"""
+from primerjava.fuzzy import fuzzy_match
+from primerjava.normalize import standardize_name
+from primerjava.parsing import Product, parse_product
+
+def _product(raw_name, source, price=1.69):
+    name = standardize_name(raw_name)
+    return Product(raw_name, name, price, source, parse_product(name))
+
+def test_conflicting_flavors_are_rejected():
+    left = [_product('ENERGIJSKI NAPITEK SUGAR FREE, RED BULL, 250ML', 'Spar')]
+    right = [_product('ENERGIJSKI NAPITEK, LUBENICA, RED BULL, 250ML', 'Mercator')]
+    assert left[0].parsed.flavor and right[0].parsed.flavor
+    assert fuzzy_match(left, right, threshold=0.0) == []
+
+def test_conflicting_brands_are_rejected():
+    left = [_product('ENERGIJSKI NAPITEK, RED BULL, 250ML', 'Spar')]
+    right = [_product('ENERGIJSKI NAPITEK, MONSTER, 250ML', 'Mercator')]
+    assert fuzzy_match(left, right, threshold=0.0) == []
+
+def test_shared_flavor_is_a_candidate():
+    left = [_product('ENERGIJSKI NAPITEK RED BULL, WINTER-LEDENA VANILIJA IN JAGODIČEVJE, 250ML', 'Spar')]
+    right = [_product('ENERGIJSKI NAPITEK, LEDENA VANILIJA IN JAGODIČEVJE, RED BULL, 0.25L', 'Mercator')]
+    matches = fuzzy_match(left, right)
+    assert [(match[0].source, match[1].source) for match in matches] == [('Spar', 'Mercator')]
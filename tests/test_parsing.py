@@ -0,0 +1,39 @@
+"""Tests of volume extraction in parse_product and ingest.extract_volumes"""
+import pandas as pd
+import pytest
+
+from primerjava.ingest import extract_volumes
+from primerjava.parsing import MAX_VOLUME_ML, parse_product
+
+NOVOLUME = (None, None, False, None, None)
+
+def _volume(parsed):
+    return (parsed.volume_str, parsed.volume_ml, parsed.is_package, parsed.package_count, parsed.single_unit_ml)
+
+@pytest.mark.parametrize('name', [
+    'RED BULL ' + '9' * 400 + 'ML',
+    'RED BULL 100000000000000000000ML',
+    'RED BULL 12345678901234567890X250ML',
+    'RED BULL ' + '9' * 400 + 'X0ML',
+    f'RED BULL {MAX_VOLUME_ML + 1}X1ML',
+])
+def test_absurd_volume_is_novolume(name):
+    parsed = parse_product(name)
+    assert _volume(parsed) == NOVOLUME
+    assert parsed.match_key == 'RED_BULL_NOFLAVOR_NOVOLUME'
+
+@pytest.mark.parametrize('name, expected', [
+    ('RED BULL 250ML', ('SINGLE_250ML', 250, False, 1, 250)),
+    ('COCA COLA 6X0.33L', ('PACK_6X330ML', 1980, True, 6, 330)),
+    (f'RED BULL {MAX_VOLUME_ML}ML', (f'SINGLE_{MAX_VOLUME_ML}ML', MAX_VOLUME_ML, False, 1, MAX_VOLUME_ML)),
+])
+def test_volume(name, expected):
+    assert _volume(parse_product(name)) == expected
+
+def test_extract_volumes_matches_parse_product():
+    names = ['RED BULL ' + '9' * 400 + 'ML', 'RED BULL 100000000000000000000ML', '12345678901234567890X0ML',
+             f'{MAX_VOLUME_ML + 1}X1ML', f'{MAX_VOLUME_ML - 1}X1ML', f'{MAX_VOLUME_ML}ML', 'FANTA 1.5L', '4X0.5L', 'OSHEE']
+    volumes = extract_volumes(pd.Series(names, dtype=object))
+    for name, row in zip(names, volumes.itertuples(index=False)):
+        got = tuple(None if pd.isna(value) else value for value in row)
+        assert got == _volume(parse_product(name.upper())), name
@@ -0,0 +1,8 @@
+"""Tests of the partition command line entry point"""
+from primerjava.partition import main
+
+def test_unknown_output_format_is_reported(tmp_path, capsys):
+    output = tmp_path / 'ujemanja.txt'
+    assert main(['--output', str(output), '--no-parse-cache']) == 1
+    assert 'Napaka pri izhodni datoteki' in capsys.readouterr().out
+    assert not output.exists()
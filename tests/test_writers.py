@@ -0,0 +1,27 @@
+"""Tests of the bounded ranking used by the report"""
+import numpy as np
+
+from primerjava.cli import REPORT_TOP, parse_args
+from primerjava.writers import TopN
+
+def test_topn_keeps_at_most_n_items():
+    rng = np.random.default_rng(0)
+    ranking = TopN(10)
+    scores = []
+    for batch in range(200):
+        batch_scores = rng.integers(0, 1000, size=1000).astype(np.float64)
+        ranking.push_many(batch_scores, [(batch, i) for i in range(len(batch_scores))])
+        scores.extend(batch_scores.tolist())
+        assert len(ranking) <= 10
+    
+    # Enak vrstni red kot stabilno padajoče razvrščanje vseh potisnjenih elementov
+    order = np.argsort(-np.array(scores), kind='stable')[:10]
+    assert ranking.items() == [divmod(int(position), 1000) for position in order]
+
+def test_topn_zero_keeps_nothing():
+    ranking = TopN(0)
+    ranking.push_many(np.array([1.0, 2.0]), ['a', 'b'])
+    assert ranking.items() == []
+
+def test_report_ranking_is_bounded_by_default():
+    assert parse_args([]).top == REPORT_TOP